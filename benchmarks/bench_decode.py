@@ -0,0 +1,86 @@
+"""
+Compares decoding a REST response on every access (as before) to decoding it once, with the standard library and
+with orjson (if installed). Runs without network access on generated candle and instrument pages.
+
+Each run accesses `request.response` as often as `ListIterator` does for one page; object hydration is not included.
+
+Usage: python benchmarks/bench_decode.py [rows]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lemon_markets.common import encoding  # noqa: E402
+from lemon_markets.common.requests import ApiResponse, BaseApiRequest  # noqa: E402
+
+
+def candle_page(rows: int) -> bytes:
+    return json.dumps({
+        "next": None,
+        "previous": None,
+        "results": [{"open": 100.0 + i % 7, "high": 101.5 + i % 7, "low": 99.25 + i % 7, "close": 100.75 + i % 7,
+                     "date": 1600000000.0 + 60 * i} for i in range(rows)]
+    }).encode()
+
+
+def instrument_page(rows: int) -> bytes:
+    return json.dumps({
+        "next": None,
+        "previous": None,
+        "results": [{"isin": "DE%010d" % i, "wkn": "%06d" % i, "title": "INSTRUMENT NUMBER %d AG" % i,
+                     "type": "stock"} for i in range(rows)]
+    }).encode()
+
+
+class FixtureRequest(BaseApiRequest):
+    def __init__(self, content: bytes):
+        self.authorization_token = None
+        self._response = ApiResponse(content=content, status=200, is_success=True)
+
+
+class LegacyFixtureRequest(FixtureRequest):
+    # the previous behaviour: the body is decoded with the standard library on every access
+    @property
+    def response(self):
+        return json.loads(self._response.content)
+
+
+class StdlibFixtureRequest(FixtureRequest):
+    @property
+    def response(self):
+        response = self._response
+        if not response._is_decoded:
+            response._decoded = json.loads(response.content)
+            response._is_decoded = True
+        return response._decoded
+
+
+# number of times ListIterator accesses `request.response` while building the results of one page
+ACCESSES_PER_PAGE = 3
+
+
+def access(request: BaseApiRequest):
+    for _ in range(ACCESSES_PER_PAGE):
+        request.response.get("results")
+
+
+def bench(name: str, content: bytes, number: int = 5):
+    variants = [("decode per access", LegacyFixtureRequest), ("decode once (json)", StdlibFixtureRequest)]
+    if encoding.JSON_BACKEND != "json":
+        variants.append(("decode once ({})".format(encoding.JSON_BACKEND), FixtureRequest))
+    baseline = None
+    for label, request_class in variants:
+        seconds = min(timeit.repeat(lambda: access(request_class(content)),
+                                    number=number, repeat=3)) / number
+        baseline = baseline or seconds
+        print("{:<12} {:<24} {:>9.2f} ms  {:>5.2f}x".format(name, label, seconds * 1000, baseline / seconds))
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("{} rows per page, JSON backend: {}".format(rows, encoding.JSON_BACKEND))
+    bench("candles", candle_page(rows))
+    bench("instruments", instrument_page(rows))
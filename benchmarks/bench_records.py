@@ -0,0 +1,105 @@
+"""
+Measures memory per record and construction time of candles, trades, ticks and quotes compared to the previous
+dict-backed classes. Runs without network access on generated data.
+
+Usage: python benchmarks/bench_records.py [records]
+"""
+import datetime
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lemon_markets.common.objects import AbstractApiObject  # noqa: E402
+from lemon_markets.data.ohlc import M1, Trades  # noqa: E402
+from lemon_markets.data.streams import Quote, Tick  # noqa: E402
+
+
+class LegacyM1(AbstractApiObject):
+    # a dict-backed candle, like M1 before it was turned into a record
+    Fields = M1.Fields
+
+
+class LegacyTrades(AbstractApiObject):
+    Fields = Trades.Fields
+
+
+class LegacyTick:
+    # Tick before it was turned into a record: keeps the parsed message and a __dict__
+    def __init__(self, message, subscribed):
+        self.json_content = json.loads(message)
+        self.isin = self.json_content.get("isin")
+        self.price = self.json_content.get("price")
+        self.quantity = self.json_content.get("quantity")
+        self.date = datetime.datetime.fromtimestamp(float(self.json_content.get("date")))
+        self.side = self.json_content.get("side")
+        self.specifier = subscribed[self.isin]
+
+
+class LegacyQuote:
+    def __init__(self, message, subscribed):
+        self.json_content = json.loads(message)
+        self.isin = self.json_content.get("isin")
+        self.bid_price = self.json_content.get("bid_price")
+        self.ask_price = self.json_content.get("ask_price")
+        self.date = datetime.datetime.fromtimestamp(float(self.json_content.get("date")))
+        self.bid_quantity = self.json_content.get("bid_quan")
+        self.ask_quantity = self.json_content.get("ask_quan")
+        self.specifier = subscribed[self.isin]
+
+
+SUBSCRIBED = {"US88160R1014": "with-quantity"}
+
+
+def candles(count: int) -> list:
+    return [{"open": 100.0 + i, "high": 101.5 + i, "low": 99.25 + i, "close": 100.75 + i,
+             "date": 1600000000.0 + 60 * i} for i in range(count)]
+
+
+def trades(count: int) -> list:
+    return [{"price": 100.0 + i, "date": 1600000000.0 + i} for i in range(count)]
+
+
+def ticks(count: int) -> list:
+    return [json.dumps({"isin": "US88160R1014", "price": 100.0 + i, "quantity": i, "date": 1600000000.0 + i,
+                        "side": i % 2}) for i in range(count)]
+
+
+def quotes(count: int) -> list:
+    return [json.dumps({"isin": "US88160R1014", "bid_price": 100.0 + i, "ask_price": 100.5 + i, "bid_quan": i,
+                        "ask_quan": i + 1, "date": 1600000000.0 + i}) for i in range(count)]
+
+
+def measure(build, raw: list) -> tuple:
+    """
+    :return: bytes per record (including its values and datetime, if it keeps one) and microseconds per record
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = [build(item) for item in raw]
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / len(raw), elapsed / len(raw) * 1e6
+
+
+def bench(name: str, raw: list, legacy, current):
+    legacy_size, legacy_time = measure(legacy, raw)
+    size, elapsed = measure(current, raw)
+    print("{:<7} legacy {:>6.0f} B {:>6.2f} us   record {:>6.0f} B {:>6.2f} us   memory -{:.0f}%".format(
+        name, legacy_size, legacy_time, size, elapsed, 100 - size / legacy_size * 100))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("{} records, memory per record including its values (and datetime, if it keeps one)".format(count))
+    bench("M1", candles(count), lambda item: LegacyM1(**item), lambda item: M1(**item))
+    bench("Trades", trades(count), lambda item: LegacyTrades(**item), lambda item: Trades(**item))
+    bench("Tick", ticks(count), lambda item: LegacyTick(item, SUBSCRIBED), lambda item: Tick(item, SUBSCRIBED))
+    bench("Quote", quotes(count), lambda item: LegacyQuote(item, SUBSCRIBED), lambda item: Quote(item, SUBSCRIBED))
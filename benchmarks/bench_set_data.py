@@ -0,0 +1,88 @@
+"""
+Compares hydrating a page of candles and trades with the previous `set_data` implementation, which resolved the
+type hints of the Fields class for every key of every object, to the precompiled field decoders. Runs without
+network access on generated pages.
+
+Usage: python benchmarks/bench_set_data.py [rows]
+"""
+import datetime
+import os
+import sys
+import timeit
+from typing import get_type_hints
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytz  # noqa: E402
+
+from lemon_markets.common.objects import ListIterator  # noqa: E402
+from lemon_markets.common.requests import ApiResponse, BaseApiRequest  # noqa: E402
+from lemon_markets.data.ohlc import M1, Trades  # noqa: E402
+
+
+def legacy_set_data(self, data: dict):
+    # AbstractApiObject.set_data before the field decoders were precompiled
+    for key, value in data.items():
+        if type(value) == dict:
+            setattr(self, key, get_type_hints(self.Fields)[key](**value))
+            continue
+        if type(value) == list:
+            attribute_value = [get_type_hints(self.Fields)[key].__args__[0](**item)
+                               if type(item) == dict or type(item) == list else item
+                               for item in value]
+            setattr(self, key, attribute_value)
+            continue
+
+        if get_type_hints(self.Fields).get(key) and get_type_hints(self.Fields)[key] == datetime.datetime:
+            if value:
+                if type(value) in (int, float):
+                    timestamp_value = datetime.datetime.fromtimestamp(value, tz=pytz.timezone("UTC"))
+                else:
+                    timestamp_value = value
+            else:
+                timestamp_value = None
+            setattr(self, key, timestamp_value)
+            continue
+
+        setattr(self, key, value)
+    return self
+
+
+class LegacyM1(M1):
+    set_data = legacy_set_data
+
+
+class LegacyTrades(Trades):
+    set_data = legacy_set_data
+
+
+class FixtureRequest(BaseApiRequest):
+    def __init__(self, results: list):
+        self._response = ApiResponse(content=b"-", status=200, is_success=True)
+        self._response._decoded = {"next": None, "results": results}
+        self._response._is_decoded = True
+
+
+def candles(rows: int) -> list:
+    return [{"open": 100.0 + i % 7, "high": 101.5 + i % 7, "low": 99.25 + i % 7, "close": 100.75 + i % 7,
+             "date": 1600000000.0 + 60 * i} for i in range(rows)]
+
+
+def trades(rows: int) -> list:
+    return [{"price": 100.0 + i % 7, "date": 1600000000.0 + i} for i in range(rows)]
+
+
+def bench(name: str, results: list, legacy_class, current_class, number: int = 1):
+    legacy = min(timeit.repeat(lambda: ListIterator(FixtureRequest(results), legacy_class).results, number=number,
+                               repeat=3))
+    current = min(timeit.repeat(lambda: ListIterator(FixtureRequest(results), current_class).results, number=number,
+                                repeat=3))
+    print("{:<8} legacy {:>9.2f} ms   precompiled {:>8.2f} ms   {:>6.1f}x".format(
+        name, legacy / number * 1000, current / number * 1000, legacy / current))
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("{} rows per page".format(rows))
+    bench("M1", candles(rows), LegacyM1, M1)
+    bench("Trades", trades(rows), LegacyTrades, Trades)
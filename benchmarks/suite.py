@@ -0,0 +1,259 @@
+"""
+Microbenchmarks of the hot paths of the package: hydrating objects (`set_data`), listing pages (`ListIterator`),
+building order bodies (`CreateMixin._build_body`) and decoding stream messages (`Tick`, `Quote`). They run on the
+recorded payloads in benchmarks/fixtures, repeated to the requested size, without network access.
+
+For every benchmark the time and the peak of traced memory allocations per item are reported. Results can be saved
+and compared, regressions beyond the threshold are flagged and make the run exit with status 1.
+
+Usage:
+    python benchmarks/suite.py [--rows N] [--filter TEXT] [--save FILE]
+    python benchmarks/suite.py --compare FILE      # compare with results saved before, e.g. on another commit
+    python benchmarks/suite.py --against REV       # run on REV (in a temporary git worktree) and compare
+    python benchmarks/suite.py --root PATH         # benchmark the package checked out at PATH
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+BENCHMARKS = []
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark. The decorated function gets the number of items and returns a function processing all of
+    them once.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def load_page(name: str, rows: int) -> dict:
+    with open(os.path.join(FIXTURES, name)) as file:
+        page = json.load(file)
+    results = page["results"]
+    page["results"] = [dict(results[i % len(results)]) for i in range(rows)]
+    return page
+
+
+def load_messages(name: str, rows: int) -> list:
+    with open(os.path.join(FIXTURES, name)) as file:
+        messages = [line.strip() for line in file if line.strip()]
+    return [messages[i % len(messages)] for i in range(rows)]
+
+
+def fixture_request(page: dict):
+    # an executed request holding `page` as response, built without sending anything
+    from lemon_markets.common.requests import ApiRequest, ApiResponse
+    request = ApiRequest.__new__(ApiRequest)
+    request.url = "https://paper-api.lemon.markets/rest/v1/fixture/"
+    request.url_params = {}
+    request.method = "get"
+    request._kwargs = {}
+    request._account = None
+    request.authorization_token = "fixture"
+    request._response = ApiResponse(content=json.dumps(page).encode(), status=200, is_success=True)
+    return request
+
+
+@benchmark("set_data/M1")
+def set_data_m1(rows: int):
+    from lemon_markets.data.ohlc import M1
+    results = load_page("m1_page.json", rows)["results"]
+    return lambda: [M1().set_data(row) for row in results]
+
+
+@benchmark("set_data/Order")
+def set_data_order(rows: int):
+    from lemon_markets.order import Order
+    results = load_page("orders_page.json", rows)["results"]
+    return lambda: [Order().set_data(row) for row in results]
+
+
+@benchmark("list/M1")
+def list_m1(rows: int):
+    from lemon_markets.common.objects import ListIterator
+    from lemon_markets.data.ohlc import M1
+    page = load_page("m1_page.json", rows)
+    return lambda: ListIterator(fixture_request(page), M1).results
+
+
+@benchmark("list/Trades")
+def list_trades(rows: int):
+    from lemon_markets.common.objects import ListIterator
+    from lemon_markets.data.ohlc import Trades
+    page = load_page("trades_page.json", rows)
+    return lambda: ListIterator(fixture_request(page), Trades).results
+
+
+@benchmark("list/Order")
+def list_orders(rows: int):
+    from lemon_markets.common.objects import ListIterator
+    from lemon_markets.order import Order
+    page = load_page("orders_page.json", rows)
+    return lambda: ListIterator(fixture_request(page), Order).results
+
+
+@benchmark("build_body/Order")
+def build_body_order(rows: int):
+    from lemon_markets.account import Account
+    from lemon_markets.order import Order
+    account = Account(uuid="2f4f8a52-33e1-4b0e-9f8a-3c0b44e1d5a7")
+    valid_until = datetime.datetime(2021, 9, 23, 17, 30)
+    orders = [Order(account=account, instrument="US88160R1014", quantity=1 + i % 5, valid_until=valid_until,
+                    limit_price=650.0 + i % 7, side="buy" if i % 2 else "sell", type="limit") for i in range(rows)]
+    return lambda: [order._build_body() for order in orders]
+
+
+@benchmark("stream/Tick")
+def stream_tick(rows: int):
+    from lemon_markets.data.streams import Tick
+    messages = load_messages("ticks.jsonl", rows)
+    subscribed = {json.loads(message)["isin"]: "with-quantity" for message in messages}
+    return lambda: [Tick(message, subscribed) for message in messages]
+
+
+@benchmark("stream/Quote")
+def stream_quote(rows: int):
+    from lemon_markets.data.streams import Quote
+    messages = load_messages("quotes.jsonl", rows)
+    subscribed = {json.loads(message)["isin"]: "with-quantity-with-price" for message in messages}
+    return lambda: [Quote(message, subscribed) for message in messages]
+
+
+@benchmark("stream/Tick batch")
+def stream_tick_batch(rows: int):
+    from lemon_markets.data.streams import Tick
+    messages = load_messages("ticks.jsonl", rows)
+    subscribed = {json.loads(message)["isin"]: "with-quantity" for message in messages}
+    return lambda: Tick.decode_batch(messages, subscribed)
+
+
+def measure(run, rows: int, repeat: int) -> dict:
+    run()  # warm up caches, e.g. compiled field decoders
+    gc.collect()
+    seconds = min(timeit.repeat(run, number=1, repeat=repeat))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ns_per_item": seconds / rows * 1e9, "items_per_second": rows / seconds, "peak_bytes_per_item": peak / rows}
+
+
+def run_suite(rows: int, repeat: int, name_filter: str = None) -> dict:
+    results = {}
+    for name, setup in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        try:
+            results[name] = measure(setup(rows), rows, repeat)
+        except Exception as e:  # e.g. a code path which does not exist in an older revision
+            results[name] = {"error": "{}: {}".format(e.__class__.__name__, e)}
+    return results
+
+
+def print_results(results: dict):
+    print("{:<18} {:>12} {:>14} {:>16}".format("benchmark", "ns/item", "items/s", "peak B/item"))
+    for name, result in results.items():
+        if "error" in result:
+            print("{:<18} {}".format(name, result["error"]))
+            continue
+        print("{:<18} {:>12.0f} {:>14,.0f} {:>16.0f}".format(name, result["ns_per_item"], result["items_per_second"],
+                                                             result["peak_bytes_per_item"]))
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """
+    Print the change of every benchmark and return True if any got slower or allocates more than `threshold`
+    (relative) compared to `baseline`.
+    """
+    regressed = False
+    print("{:<18} {:>12} {:>12} {:>9} {:>12} {:>12} {:>9}".format(
+        "benchmark", "base ns", "ns", "time", "base B", "B", "memory"))
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None or "error" in base or "error" in result:
+            print("{:<18} not comparable".format(name))
+            continue
+        time_ratio = result["ns_per_item"] / base["ns_per_item"]
+        memory_ratio = result["peak_bytes_per_item"] / base["peak_bytes_per_item"] if base["peak_bytes_per_item"] else 1
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append("SLOWER")
+        if memory_ratio > 1 + threshold:
+            flags.append("MORE MEMORY")
+        regressed = regressed or bool(flags)
+        print("{:<18} {:>12.0f} {:>12.0f} {:>8.2f}x {:>12.0f} {:>12.0f} {:>8.2f}x  {}".format(
+            name, base["ns_per_item"], result["ns_per_item"], time_ratio, base["peak_bytes_per_item"],
+            result["peak_bytes_per_item"], memory_ratio, " ".join(flags)))
+    return regressed
+
+
+def run_revision(revision: str, arguments: argparse.Namespace) -> dict:
+    # run this suite (not the one of `revision`) against the package checked out at `revision`
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = os.path.join(directory, "tree")
+        output = os.path.join(directory, "results.json")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, revision], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        try:
+            command = [sys.executable, os.path.abspath(__file__), "--root", worktree, "--save", output,
+                       "--rows", str(arguments.rows), "--repeat", str(arguments.repeat), "--quiet"]
+            if arguments.filter:
+                command += ["--filter", arguments.filter]
+            subprocess.run(command, check=True)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, check=False)
+        with open(output) as file:
+            return json.load(file)["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of lemon_markets, without network access.")
+    parser.add_argument("--rows", type=int, default=10000, help="items per benchmark run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark, the fastest one is reported")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--save", help="save the results as JSON to this file")
+    parser.add_argument("--compare", help="compare with the results saved in this file")
+    parser.add_argument("--against", help="compare with the results of this git revision")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change flagged as regression")
+    parser.add_argument("--root", default=ROOT, help="directory of the package to benchmark")
+    parser.add_argument("--quiet", action="store_true", help="do not print the results")
+    arguments = parser.parse_args()
+
+    baseline = None
+    if arguments.against:
+        baseline = run_revision(arguments.against, arguments)
+    elif arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)["results"]
+
+    sys.path.insert(0, os.path.abspath(arguments.root))
+    results = run_suite(arguments.rows, arguments.repeat, arguments.filter)
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump({"python": sys.version.split()[0], "rows": arguments.rows, "results": results}, file, indent=2)
+    if baseline is None:
+        if not arguments.quiet:
+            print_results(results)
+        return 0
+    return 1 if compare(baseline, results, arguments.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
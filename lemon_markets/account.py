@@ -17,8 +17,9 @@ class AccountState:
             method="GET",
             authorization_token=self._token
         )
-        self._cash_to_invest = request.response.get("cash_to_invest")
-        self._total_balance = request.response.get("total_balance")
+        response = request.response
+        self._cash_to_invest = response.get("cash_to_invest")
+        self._total_balance = response.get("total_balance")
 
     @property
     def cash_in_invest(self) -> float:
@@ -56,15 +57,16 @@ class Account(AccountState, UUIDObjectMixin, AbstractApiObjectMixin, ListMixin):
         return self._token if self._token else None
 
     def retrieve(self):
-        self.check_instance()
-        request = ApiRequest(
-            endpoint="accounts/{}/".format(self.uuid),
-            method="GET",
-            authorization_token=self._token
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
-        self.set_data(request.response)
-        return self
+    def _retrieve_request_arguments(self) -> dict:
+        self.check_instance()
+        return {
+            "endpoint": "accounts/{}/".format(self.uuid),
+            "method": "GET",
+            "authorization_token": self._token
+        }
 
     @staticmethod
     def list(authorization_token: Union[str, "Token"], limit: int = None, offset: int = None) -> ListIterator:
@@ -73,3 +75,12 @@ class Account(AccountState, UUIDObjectMixin, AbstractApiObjectMixin, ListMixin):
                               limit=limit,
                               offset=offset
                               )
+
+    @staticmethod
+    async def list_async(authorization_token: Union[str, "Token"], limit: int = None,
+                         offset: int = None) -> ListIterator:
+        return await ListMixin.list_async(object_class=Account,
+                                          authorization_token=authorization_token,
+                                          limit=limit,
+                                          offset=offset
+                                          )
@@ -0,0 +1,209 @@
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from lemon_markets.common.objects import ListIterator, ListMixin
+from lemon_markets.common.requests import ApiRequest
+from lemon_markets.instrument import Instrument
+from lemon_markets.settings import DEFAULT_CATALOG_PATH
+
+ISIN_PATTERN = re.compile(r"^[A-Z]{2}[A-Z0-9]{9}[0-9]$")
+WKN_PATTERN = re.compile(r"^[A-Z0-9]{6}$")
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS instruments (
+        isin TEXT PRIMARY KEY,
+        wkn TEXT,
+        title TEXT,
+        type TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS instruments_wkn ON instruments (wkn)",
+    "CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+FULL_TEXT_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS instruments_fts USING fts5(title, content='instruments', content_rowid='rowid')",
+    """CREATE TRIGGER IF NOT EXISTS instruments_fts_insert AFTER INSERT ON instruments BEGIN
+        INSERT INTO instruments_fts (rowid, title) VALUES (new.rowid, new.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS instruments_fts_delete AFTER DELETE ON instruments BEGIN
+        INSERT INTO instruments_fts (instruments_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS instruments_fts_update AFTER UPDATE ON instruments BEGIN
+        INSERT INTO instruments_fts (instruments_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO instruments_fts (rowid, title) VALUES (new.rowid, new.title);
+    END""",
+)
+
+
+class InstrumentCatalog:
+    """
+    A local copy of all instruments available on lemon.markets, stored in an SQLite database, for resolving
+    instruments without calling the API::
+
+        catalog = InstrumentCatalog(authorization_token=my_token)
+        catalog.sync(max_age=24 * 60 * 60)  # only calls the API if the last sync is older than a day
+
+        catalog.get("US88160R1014")  # by ISIN
+        catalog.get("A1CX3T")  # by WKN
+        catalog.search("tesla")  # full-text search on the title
+
+    Exact lookups and title prefix searches are answered from an in-memory index loaded from the database on first
+    use, full-text searches use the SQLite FTS5 extension (or a slower LIKE query if FTS5 is not available).
+
+    :param path: path of the SQLite database, it is created if it does not exist. ":memory:" keeps the catalog in
+        memory only
+    :param authorization_token: the token used to sync the catalog
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, authorization_token: Union[str, "Token"] = None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.authorization_token = authorization_token
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._rows: Optional[Dict[str, Tuple[str, str, str]]] = None
+        self._by_wkn: Dict[str, str] = {}
+        self._titles: List[Tuple[str, str]] = []
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+            try:
+                for statement in FULL_TEXT_SCHEMA:
+                    self._connection.execute(statement)
+                self._full_text = True
+            except sqlite3.OperationalError:  # SQLite was compiled without FTS5
+                self._full_text = False
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def last_synced(self) -> Optional[float]:
+        """
+        Unix timestamp of the last completed sync, None if the catalog has never been synced.
+        """
+        row = self._connection.execute("SELECT value FROM catalog_meta WHERE key = 'last_synced'").fetchone()
+        return float(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def _index(self) -> Dict[str, Tuple[str, str, str]]:
+        with self._lock:
+            if self._rows is None:
+                rows = self._connection.execute("SELECT isin, wkn, title, type FROM instruments").fetchall()
+                self._rows = {isin: (wkn, title, type_) for isin, wkn, title, type_ in rows}
+                self._by_wkn = {wkn: isin for isin, (wkn, _, _) in self._rows.items() if wkn}
+                self._titles = sorted(((title or "").lower(), isin) for isin, (_, title, _) in self._rows.items())
+            return self._rows
+
+    def _build_instrument(self, isin: str) -> Instrument:
+        wkn, title, type_ = self._index()[isin]
+        return Instrument(isin=isin, wkn=wkn, title=title, type=type_, authorization_token=self.authorization_token)
+
+    def sync(self, max_age: float = None, type: Union[str, list] = "") -> dict:
+        """
+        Update the catalog from the API. Only changed instruments are written, instruments which are no longer
+        available are removed.
+
+        Note:
+            Every sync still pages through all instruments (of `type`): the instruments endpoint has no filter for
+            instruments changed since a date, and removed instruments only show by their absence from the full list.
+            Only the writes to the database are incremental, use `max_age` to limit how often the API is paged.
+
+        :param max_age: skip the sync if the last one is younger than `max_age` seconds
+        :param type: only sync instruments of this type (or these types). Instruments of other types are kept
+        :return: the number of instruments `added`, `updated` and `removed`, or an empty dict if the sync was skipped
+        """
+        last_synced = self.last_synced
+        if max_age is not None and last_synced is not None and time.time() - last_synced < max_age:
+            return {}
+
+        started = time.time()
+        request_arguments = ListMixin._build_list_request_arguments(Instrument, type=type,
+                                                                    authorization_token=self.authorization_token)
+        request_arguments["cache"] = False  # the catalog is a cache itself, always fetch the current state
+        request = ApiRequest(**request_arguments)
+        fetched = {}
+        for instrument in ListIterator(request=request, object_class=Instrument):
+            fetched[instrument.isin] = (getattr(instrument, "wkn", None), getattr(instrument, "title", None),
+                                        getattr(instrument, "type", None))
+
+        with self._lock:
+            existing = self._index()
+            types = set(type.split(",") if isinstance(type, str) else type) - {""}
+            added = [(isin,) + row for isin, row in fetched.items() if isin not in existing]
+            updated = [row + (isin,) for isin, row in fetched.items() if isin in existing and existing[isin] != row]
+            removed = [(isin,) for isin, (_, _, type_) in existing.items()
+                       if isin not in fetched and (not types or type_ in types)]
+            with self._connection:
+                self._connection.executemany("DELETE FROM instruments WHERE isin = ?", removed)
+                self._connection.executemany("UPDATE instruments SET wkn = ?, title = ?, type = ? WHERE isin = ?",
+                                             updated)
+                self._connection.executemany("INSERT INTO instruments (isin, wkn, title, type) VALUES (?, ?, ?, ?)",
+                                             added)
+                self._connection.execute("INSERT OR REPLACE INTO catalog_meta (key, value) "
+                                         "VALUES ('last_synced', ?)", (str(started),))
+            self._rows = None
+        return {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+    def get(self, identifier: str) -> Optional[Instrument]:
+        """
+        Look up an instrument by its ISIN or WKN.
+        """
+        identifier = identifier.strip().upper()
+        rows = self._index()
+        if identifier in rows:
+            return self._build_instrument(identifier)
+        isin = self._by_wkn.get(identifier)
+        if isin is not None:
+            return self._build_instrument(isin)
+        return None
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> List[Instrument]:
+        """
+        All instruments whose title starts with `prefix` (case-insensitive), ordered by title.
+        """
+        self._index()
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._titles, (prefix, ""))
+        results = []
+        for title, isin in self._titles[start:start + limit]:
+            if not title.startswith(prefix):
+                break
+            results.append(self._build_instrument(isin))
+        return results
+
+    def search(self, query: str, limit: int = 20) -> List[Instrument]:
+        """
+        Resolve `query` as ISIN or WKN if it looks like one, otherwise search the titles. Every word of the query has
+        to match the beginning of a word of the title, e.g. "daim tr" finds "DAIMLER TRUCK HOLDING AG".
+        """
+        normalized = query.strip().upper()
+        if ISIN_PATTERN.match(normalized) or WKN_PATTERN.match(normalized):
+            instrument = self.get(normalized)
+            if instrument is not None:
+                return [instrument]
+
+        words = re.findall(r"\w+", query, flags=re.UNICODE)
+        if not words:
+            return []
+        with self._lock:
+            if self._full_text:
+                match = " ".join('"{}"*'.format(word) for word in words)
+                rows = self._connection.execute(
+                    "SELECT instruments.isin FROM instruments_fts JOIN instruments "
+                    "ON instruments.rowid = instruments_fts.rowid WHERE instruments_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit)).fetchall()
+            else:
+                condition = " AND ".join("title LIKE ?" for _ in words)
+                rows = self._connection.execute(
+                    "SELECT isin FROM instruments WHERE {} ORDER BY title LIMIT ?".format(condition),
+                    ["%{}%".format(word) for word in words] + [limit]).fetchall()
+        return [self._build_instrument(isin) for isin, in rows if isin in self._index()]
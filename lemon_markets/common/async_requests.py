@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import weakref
+from typing import Union
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, install with `pip install lemon_markets[async]`
+    aiohttp = None
+
+from lemon_markets.common.cache import ResponseCache
+from lemon_markets.common.errors import MissingDependencyError
+from lemon_markets.common.ratelimit import get_rate_limiter
+from lemon_markets.common.requests import ApiResponse, BaseApiRequest
+from lemon_markets.common.retry import get_retry_policy, parse_retry_after
+from lemon_markets.common.singleflight import get_single_flight
+from lemon_markets.settings import DEFAULT_ASYNC_MAX_CONCURRENCY, DEFAULT_ASYNC_LIMIT_PER_HOST
+
+
+class AsyncSessionPool:
+    """
+    Keep-alive connection pool shared by every :class:`AsyncApiRequest` running in the same event loop.
+
+    aiohttp sessions are bound to the loop they were created in, so one session (and one concurrency limit) is kept
+    per loop.
+
+    :param max_concurrency: maximum number of requests in flight per event loop. Further requests wait for a free slot
+    :param limit_per_host: maximum number of connections per host, 0 means no limit apart from `max_concurrency`
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_ASYNC_MAX_CONCURRENCY,
+                 limit_per_host: int = DEFAULT_ASYNC_LIMIT_PER_HOST):
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self._loops = weakref.WeakKeyDictionary()
+
+    def acquire(self) -> tuple:
+        """
+        Return the session and the concurrency limiting semaphore of the running event loop.
+        """
+        if aiohttp is None:
+            raise MissingDependencyError(detail="aiohttp is required for asynchronous requests. Install it with "
+                                                "`pip install lemon_markets[async]`.")
+        loop = asyncio.get_event_loop()
+        session, semaphore = self._loops.get(loop, (None, None))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.limit_per_host)
+            session = aiohttp.ClientSession(connector=connector, headers={"Connection": "keep-alive"})
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loops[loop] = (session, semaphore)
+        return session, semaphore
+
+    async def close(self):
+        """
+        Close the session of the running event loop. Call this before the loop is shut down.
+        """
+        session, _ = self._loops.pop(asyncio.get_event_loop(), (None, None))
+        if session is not None:
+            await session.close()
+
+
+_async_session_pool: AsyncSessionPool = None
+_async_session_pool_lock = threading.Lock()
+
+
+def get_async_session_pool() -> AsyncSessionPool:
+    """
+    Return the pool used by all asynchronous requests, creating it with the default settings on first use.
+    """
+    global _async_session_pool
+    if _async_session_pool is None:
+        with _async_session_pool_lock:
+            if _async_session_pool is None:
+                _async_session_pool = AsyncSessionPool()
+    return _async_session_pool
+
+
+def configure_async_session_pool(max_concurrency: int = DEFAULT_ASYNC_MAX_CONCURRENCY,
+                                 limit_per_host: int = DEFAULT_ASYNC_LIMIT_PER_HOST) -> AsyncSessionPool:
+    """
+    Replace the pool used by all asynchronous requests. Sessions of the previous pool have to be closed by awaiting
+    its :meth:`AsyncSessionPool.close`.
+    """
+    global _async_session_pool
+    with _async_session_pool_lock:
+        _async_session_pool = AsyncSessionPool(max_concurrency=max_concurrency, limit_per_host=limit_per_host)
+    return _async_session_pool
+
+
+class AsyncApiRequest(BaseApiRequest):
+    """
+    The asyncio counterpart of :class:`lemon_markets.common.requests.ApiRequest`. Instantiating it does not send
+    anything, await :meth:`perform` to do so::
+
+        request = await AsyncApiRequest(endpoint="data/instruments/", authorization_token=token).perform()
+        request.response
+    """
+
+    def __init__(self, endpoint: str, method: str = "GET", body: dict = None,
+                 authorization_token: Union[str, "Token"] = None, url_params: dict = {}, **kwargs):
+        super().__init__(endpoint=endpoint, method=method, body=body, authorization_token=authorization_token,
+                         url_params=url_params, **kwargs)
+
+    def _build_request_arguments(self, headers: dict) -> dict:
+        request_arguments = {
+            "headers": headers,
+            # aiohttp only accepts strings as query values, requests converts them implicitly
+            "params": {param: str(value) for param, value in self.url_params.items() if value is not None},
+        }
+        if self.method == "post":
+            request_arguments["json"] = self.body
+        elif self.method == "patch":
+            request_arguments["data"] = self.body
+        if self._kwargs.get("timeout") is not None:
+            request_arguments["timeout"] = aiohttp.ClientTimeout(total=self._kwargs["timeout"])
+        return request_arguments
+
+    async def _send(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                    request_arguments: dict) -> tuple:
+        async with semaphore:
+            async with session.request(self.method.upper(), self.url, **request_arguments) as response:
+                return response, await response.read()
+
+    async def perform(self) -> "AsyncApiRequest":
+        headers = self._build_headers()
+        cached = self._cache_lookup(headers)
+        if cached is not None:
+            self._response = cached
+            return self
+        if self.method == "get" and self._kwargs.get("single_flight", True):
+            # identical GET requests in flight in the same event loop share one call and one response, see
+            # :meth:`lemon_markets.common.requests.ApiRequest._perform_request`
+            key = ResponseCache.key(self.url, self.url_params, self.authorization_token)
+            self._response = await get_single_flight().do_async(key, lambda: self._fetch(headers))
+        else:
+            self._response = await self._fetch(headers)
+        return self
+
+    async def _fetch(self, headers: dict) -> ApiResponse:
+        session, semaphore = get_async_session_pool().acquire()
+        rate_limiter = get_rate_limiter()
+        retry_policy = get_retry_policy()
+        request_arguments = self._build_request_arguments(headers)
+
+        attempt = 0
+        while True:
+            delay = rate_limiter.reserve(self.url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response, content = await self._send(session, semaphore, request_arguments)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                request_sent = not isinstance(e, aiohttp.ClientConnectorError)
+                if not retry_policy.should_retry(self.method, attempt, error=e, request_sent=request_sent):
+                    raise e
+                await asyncio.sleep(retry_policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if retry_policy.should_retry(self.method, attempt, status=response.status):
+                backoff = retry_policy.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                if response.status == 429:
+                    # hold back all requests of this endpoint group, not just this one
+                    rate_limiter.block(self.url, backoff)
+                else:
+                    await asyncio.sleep(backoff)
+                attempt += 1
+                continue
+
+            built = self._build_response(content=content, status=response.status,
+                                         is_success=200 <= response.status < 300, headers=response.headers)
+            if built is None:  # the cached response was evicted before the server confirmed it
+                headers = self._without_validators(headers)
+                request_arguments = self._build_request_arguments(headers)
+                continue
+            return built
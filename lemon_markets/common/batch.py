@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+from lemon_markets.common.requests import ApiRequest
+from lemon_markets.settings import DEFAULT_BATCH_MAX_WORKERS
+
+
+class PreparedRequest:
+    """
+    A deferred :class:`ApiRequest` together with the function building the resulting object from its response.
+    Created by e.g. :meth:`lemon_markets.order.Order.prepare_retrieve`.
+    """
+
+    def __init__(self, request: ApiRequest, build: Callable[[ApiRequest], Any] = None):
+        self.request = request
+        self._build = build
+
+    def execute(self) -> Any:
+        """
+        Send the request and return the built object, or the request itself if there is nothing to build.
+        """
+        self.request.execute()
+        if self._build is None:
+            return self.request
+        return self._build(self.request)
+
+
+class BatchResult:
+    """
+    The outcome of a single :class:`PreparedRequest` executed by a :class:`BatchExecutor`. Either `value` holds the
+    built object or `error` holds the exception raised while executing it.
+    """
+    value: Any = None
+    error: Exception = None
+
+    def __init__(self, value: Any = None, error: Exception = None):
+        self.value = value
+        self.error = error
+
+    @property
+    def successful(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.successful:
+            return "BatchResult(value={!r})".format(self.value)
+        return "BatchResult(error={!r})".format(self.error)
+
+
+class BatchExecutor:
+    """
+    Executes prepared requests concurrently on a thread pool, sharing the keep-alive connections of the
+    :class:`lemon_markets.common.requests.SessionPool`::
+
+        executor = BatchExecutor(max_workers=8)
+        results = executor.run([order.prepare_retrieve(), portfolio.prepare_retrieve(),
+                                M1().prepare_latest("US88160R1014")])
+        orders = [result.value for result in results if result.successful]
+
+    :param max_workers: maximum number of requests in flight at the same time
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_BATCH_MAX_WORKERS):
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _execute(prepared: PreparedRequest) -> BatchResult:
+        try:
+            return BatchResult(value=prepared.execute())
+        except Exception as e:
+            return BatchResult(error=e)
+
+    def run(self, prepared: Iterable[PreparedRequest], raise_errors: bool = False) -> List[BatchResult]:
+        """
+        Execute all prepared requests and return their results in the order they were passed in.
+
+        :param prepared: the prepared requests
+        :param raise_errors: raise the first error (in order) instead of capturing it in the result
+        """
+        prepared = list(prepared)
+        if not prepared:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(prepared))) as pool:
+            results = list(pool.map(self._execute, prepared))
+        if raise_errors:
+            for result in results:
+                if not result.successful:
+                    raise result.error
+        return results
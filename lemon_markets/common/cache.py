@@ -0,0 +1,167 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, Optional
+
+from lemon_markets.settings import DEFAULT_CACHE_MAXSIZE, DEFAULT_CACHE_POLICIES
+
+
+# the headers of a conditional request, see CacheEntry.validators
+VALIDATOR_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CacheEntry:
+    """
+    A cached response together with its expiry and the validators sent by the server.
+    """
+
+    def __init__(self, response: "ApiResponse", ttl: float, etag: str = None, last_modified: str = None):
+        self.response = response
+        self.expires_at = time.monotonic() + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> dict:
+        """
+        The headers of a conditional request revalidating this entry.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Thread-safe TTL/LRU cache for the responses of GET requests, shared by all requests.
+
+    Only endpoints matching one of the `policies` are cached, each with its own time to live. Once an entry has
+    expired it is revalidated with the server (If-None-Match/If-Modified-Since) if the server sent an ETag or
+    Last-Modified header, otherwise it is fetched again. If more than `maxsize` responses are cached, the least
+    recently used ones are evicted.
+
+    :param maxsize: maximum number of cached responses, 0 disables caching
+    :param policies: regular expressions matched against the endpoint (relative to the REST API url), mapped to the
+        time to live of their responses in seconds
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_MAXSIZE, policies: Mapping[str, float] = DEFAULT_CACHE_POLICIES):
+        self.maxsize = maxsize
+        self._policies = [(re.compile(pattern), ttl) for pattern, ttl in policies.items()]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def ttl_for(self, endpoint: Optional[str]) -> Optional[float]:
+        """
+        The time to live of responses of `endpoint`, or None if they are not cached.
+        """
+        if not self.maxsize or endpoint is None:
+            return None
+        for pattern, ttl in self._policies:
+            if pattern.match(endpoint):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(url: str, url_params: dict, authorization_token: Optional[str]) -> tuple:
+        # responses depend on the token, e.g. a strategy token only sees the orders of its strategy
+        return url, tuple(sorted((str(param), str(value)) for param, value in (url_params or {}).items())), \
+            authorization_token
+
+    def get(self, key: tuple) -> Optional[CacheEntry]:
+        """
+        Return the entry stored under `key`, fresh or not, and count the lookup as hit or miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def store(self, key: tuple, response: "ApiResponse", ttl: float, headers: Mapping[str, str]):
+        entry = CacheEntry(response=response, ttl=ttl, etag=headers.get("ETag"),
+                           last_modified=headers.get("Last-Modified"))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def revalidate(self, key: tuple, ttl: float, headers: Mapping[str, str]) -> Optional["ApiResponse"]:
+        """
+        Mark the entry stored under `key` as fresh again after the server answered 304 Not Modified.
+
+        :return: the cached response, or None if it has been evicted in the meantime
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.revalidations += 1
+            entry.expires_at = time.monotonic() + ttl
+            entry.etag = headers.get("ETag", entry.etag)
+            entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+            return entry.response
+
+    def invalidate(self, url: str = None):
+        """
+        Drop all cached responses of `url`, or all cached responses if no url is passed.
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == url]:
+                del self._entries[key]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+
+_response_cache: ResponseCache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the cache used by all requests, creating it with the default settings on first use.
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+
+def configure_response_cache(maxsize: int = DEFAULT_CACHE_MAXSIZE,
+                             policies: Mapping[str, float] = DEFAULT_CACHE_POLICIES) -> ResponseCache:
+    """
+    Replace the cache used by all requests. ``configure_response_cache(maxsize=0)`` disables caching.
+    """
+    global _response_cache
+    with _response_cache_lock:
+        _response_cache = ResponseCache(maxsize=maxsize, policies=policies)
+    return _response_cache
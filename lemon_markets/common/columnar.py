@@ -0,0 +1,142 @@
+"""
+Columnar decoding of list pages, straight from the decoded JSON into typed arrays without building an object per row.
+
+The columns are derived from the Fields class of the listed objects: ``float`` fields become float64 columns,
+``int`` fields int64, ``bool`` fields bool, ``str`` fields object (numpy) or string (arrow) columns and
+``datetime.datetime`` fields int64 columns holding milliseconds since the epoch (UTC). Fields holding nested objects
+are skipped.
+
+Missing values (null in the response or a key which is not there) are NaN in float columns and None in string columns.
+int, bool and timestamp columns with missing values are :class:`numpy.ma.MaskedArray` whose mask marks them, other
+columns are plain arrays. In arrow tables missing values are null.
+
+numpy (``pip install lemon_markets[numpy]``) and pyarrow (``pip install lemon_markets[arrow]``) are optional.
+"""
+import datetime
+from typing import Dict, Iterable, List, Tuple, get_type_hints
+
+try:
+    import numpy
+except ImportError:  # optional dependency
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:  # optional dependency
+    pyarrow = None
+
+from lemon_markets.common.errors import MissingDependencyError
+
+FLOAT = "float64"
+INT = "int64"
+BOOL = "bool"
+STRING = "object"
+TIMESTAMP = "timestamp"  # int64 milliseconds since the epoch
+
+COLUMN_TYPES = {
+    float: FLOAT,
+    int: INT,
+    bool: BOOL,
+    str: STRING,
+    datetime.datetime: TIMESTAMP,
+}
+
+
+def require_numpy():
+    if numpy is None:
+        raise MissingDependencyError(detail="numpy is required for columnar results. Install it with "
+                                            "`pip install lemon_markets[numpy]`.")
+
+
+def require_pyarrow():
+    if pyarrow is None:
+        raise MissingDependencyError(detail="pyarrow is required for arrow results. Install it with "
+                                            "`pip install lemon_markets[arrow]`.")
+
+
+def columns_of(object_class) -> List[Tuple[str, str]]:
+    """
+    The (name, column type) pairs of all fields of `object_class` which can be stored in a column.
+    """
+    return [(key, COLUMN_TYPES[hint]) for key, hint in get_type_hints(object_class.Fields).items()
+            if hint in COLUMN_TYPES]
+
+
+def _decode_column(rows: list, key: str, column_type: str) -> "numpy.ndarray":
+    values = [row.get(key) for row in rows]
+    if column_type in (FLOAT, STRING):
+        return numpy.array(values, dtype=column_type)
+    if column_type == TIMESTAMP:
+        seconds = numpy.array(values, dtype=FLOAT)
+        missing = numpy.isnan(seconds)
+        if not missing.any():
+            return numpy.rint(seconds * 1000).astype(INT)
+        column = numpy.rint(numpy.where(missing, 0, seconds) * 1000).astype(INT)
+    else:
+        missing = numpy.fromiter((value is None for value in values), dtype=BOOL, count=len(values))
+        if not missing.any():
+            return numpy.array(values, dtype=column_type)
+        column = numpy.array([value if value is not None else 0 for value in values], dtype=column_type)
+    # the values under the mask are only placeholders
+    return numpy.ma.MaskedArray(column, mask=missing)
+
+
+def _concatenate(chunks: list) -> "numpy.ndarray":
+    if any(isinstance(chunk, numpy.ma.MaskedArray) for chunk in chunks):
+        return numpy.ma.concatenate(chunks)
+    return numpy.concatenate(chunks)
+
+
+def drop_missing(columns: Dict[str, "numpy.ndarray"], key: str) -> Dict[str, "numpy.ndarray"]:
+    """
+    The rows of `columns` which have a value in the column `key`. Columns without missing values left are plain
+    arrays.
+    """
+    if not numpy.ma.is_masked(columns[key]):
+        return columns
+    missing = numpy.ma.getmaskarray(columns[key])
+    columns = {name: column[~missing] for name, column in columns.items()}
+    return {name: column if numpy.ma.getmaskarray(column).any() else numpy.ma.getdata(column)
+            for name, column in columns.items()}
+
+
+def to_numpy(object_class, pages: Iterable[list]) -> Dict[str, "numpy.ndarray"]:
+    """
+    Decode the raw results of `pages` into one numpy array per column, masked if values of an int, bool or
+    timestamp column are missing.
+
+    :param object_class: the class of the listed objects, its Fields class defines the columns
+    :param pages: the raw (decoded JSON) results of every page
+    """
+    require_numpy()
+    columns = columns_of(object_class)
+    chunks = {key: [] for key, _ in columns}
+    for rows in pages:
+        if not rows:
+            continue
+        for key, column_type in columns:
+            chunks[key].append(_decode_column(rows, key, column_type))
+    return {key: _concatenate(chunks[key]) if chunks[key] else _decode_column([], key, column_type)
+            for key, column_type in columns}
+
+
+def to_arrow(object_class, pages: Iterable[list]) -> "pyarrow.Table":
+    """
+    Decode the raw results of `pages` into an arrow table. Timestamp columns use the arrow type
+    ``timestamp("ms", tz="UTC")``, missing values are null.
+    """
+    require_pyarrow()
+    arrays = to_numpy(object_class, pages)
+    fields = []
+    for key, column_type in columns_of(object_class):
+        if column_type == STRING:
+            fields.append((key, pyarrow.array(arrays[key], type=pyarrow.string())))
+            continue
+        values = numpy.ma.getdata(arrays[key])
+        missing = numpy.isnan(values) if column_type == FLOAT else numpy.ma.getmaskarray(arrays[key])
+        mask = missing if missing.any() else None
+        if column_type == TIMESTAMP:
+            fields.append((key, pyarrow.array(values, mask=mask, type=pyarrow.timestamp("ms", tz="UTC"))))
+        else:
+            fields.append((key, pyarrow.array(values, mask=mask)))
+    return pyarrow.table({key: array for key, array in fields})
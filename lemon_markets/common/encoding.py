@@ -0,0 +1,24 @@
+"""
+JSON (de)serialization used for all REST responses and stream messages.
+
+If `orjson <https://github.com/ijl/orjson>`_ is installed (``pip install lemon_markets[speedups]``) it is used
+automatically, otherwise the standard library is used. Both accept ``str`` and ``bytes`` and raise a subclass of
+:class:`json.JSONDecodeError` for invalid input.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    JSON_BACKEND: str = "orjson"
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    JSON_BACKEND: str = "json"
+    loads = json.loads
+    dumps = json.dumps
@@ -20,3 +20,7 @@ class RestApiError(BaseError):
 
 class StreamError(BaseError):
     pass
+
+
+class MissingDependencyError(BaseError):
+    pass
@@ -1,13 +1,69 @@
+import asyncio
 import datetime
-from typing import get_type_hints, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import get_type_hints, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
 import pytz as pytz
 
+from lemon_markets.common import columnar
+from lemon_markets.common.async_requests import AsyncApiRequest
+from lemon_markets.common.batch import PreparedRequest
 from lemon_markets.common.errors import RestApiError
-from lemon_markets.common.requests import ApiRequest
+from lemon_markets.common.requests import ApiRequest, BaseApiRequest
+
+
+UTC = pytz.timezone("UTC")
+
+
+def _decode_datetime(value):
+    if value:
+        if type(value) in (int, float):
+            return datetime.datetime.fromtimestamp(value, tz=UTC)
+        return value
+    return None
+
+
+def _build_field_decoder(hint) -> Optional[Callable]:
+    """
+    Build the function converting a raw API value into the type annotated in a Fields class, or None if the value is
+    used as it is.
+    """
+    if hint == datetime.datetime:
+        return _decode_datetime
+
+    if getattr(hint, "__origin__", None) in (list, List) and getattr(hint, "__args__", None):
+        item_class = hint.__args__[0]
+
+        def decode_list(value):
+            if type(value) == list:
+                return [item_class(**item) if type(item) == dict else item for item in value]
+            return value
+        return decode_list
+
+    if isinstance(hint, type) and hint not in (str, int, float, bool):
+        def decode_object(value):
+            if type(value) == dict:
+                return hint(**value)
+            return value
+        return decode_object
+
+    return None
+
+
+def compile_field_decoders(fields: type) -> Dict[str, Callable]:
+    """
+    Map every field of a Fields class that needs converting to its decoder.
+    """
+    decoders = {}
+    for key, hint in get_type_hints(fields).items():
+        decoder = _build_field_decoder(hint)
+        if decoder is not None:
+            decoders[key] = decoder
+    return decoders
 
 
 class AbstractApiObject:
+    __slots__ = ()
     _data: dict
 
     class Fields:
@@ -21,35 +77,94 @@ class AbstractApiObject:
         if kwargs:
             self.set_data(kwargs)
 
-    def __setattr__(self, key, value):
-        super().__setattr__(key, value)
+    @classmethod
+    def _field_decoders(cls) -> Dict[str, Callable]:
+        """
+        The decoders of the fields of this class, compiled from its Fields class on first use.
+        """
+        decoders = cls.__dict__.get("_compiled_field_decoders")
+        if decoders is None:
+            decoders = compile_field_decoders(cls.Fields)
+            cls._compiled_field_decoders = decoders
+        return decoders
 
     def set_data(self, data: dict):
+        decoders = self._field_decoders()
         for key, value in data.items():
-            if type(value) == dict:
-                setattr(self, key, get_type_hints(self.Fields)[key](**value))
-                continue
-            if type(value) == list:
-                attribute_value = [get_type_hints(self.Fields)[key].__args__[0](**item)
-                                   if type(item) == dict or type(item) == list else item
-                                   for item in value]
-                setattr(self, key, attribute_value)
-                continue
+            decoder = decoders.get(key)
+            setattr(self, key, decoder(value) if decoder is not None else value)
+        return self
 
-            if get_type_hints(self.Fields).get(key) and get_type_hints(self.Fields)[key] == datetime.datetime:
-                if value:
-                    if type(value) in (int, float):
-                        timestamp_value = datetime.datetime.fromtimestamp(value, tz=pytz.timezone("UTC"))
-                    else:
-                        timestamp_value = value
-                else:
-                    timestamp_value = None
-                setattr(self, key, timestamp_value)
-                continue
 
-            setattr(self, key, value)
+class AbstractApiRecord(AbstractApiObject):
+    """
+    Base class of memory-lean objects holding plain data, like candles or trades. The fields declared in `__slots__`
+    are stored without a per-object ``__dict__``. A field can also be a property storing its value in a slot (like a
+    `date` kept as the timestamp received), the property converts the raw value itself. Values of other keys returned
+    by the API are kept in a dict which is only allocated if there are any. Like other objects, records listed by a
+    request get its account and token, they are not part of the representation.
+    """
+    __slots__ = ("_extra", "account", "authorization_token")
+
+    def __init__(self, **kwargs):
+        self._extra = None
+        super().__init__(**kwargs)
+
+    @classmethod
+    def _field_decoders(cls) -> Dict[str, Callable]:
+        decoders = cls.__dict__.get("_compiled_field_decoders")
+        if decoders is None:
+            decoders = {key: decoder for key, decoder in compile_field_decoders(cls.Fields).items()
+                        if not isinstance(getattr(cls, key, None), property)}
+            cls._compiled_field_decoders = decoders
+        return decoders
+
+    def set_data(self, data: dict):
+        decoders = self._field_decoders()
+        for key, value in data.items():
+            decoder = decoders.get(key)
+            if decoder is not None:
+                value = decoder(value)
+            try:
+                setattr(self, key, value)
+            except AttributeError:  # not a slot
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
         return self
 
+    def __getattr__(self, item):
+        # only called if the attribute was not found, i.e. for unset slots and keys not declared as slot
+        extra = object.__getattribute__(self, "_extra") if item != "_extra" else None
+        if extra and item in extra:
+            return extra[item]
+        raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, item))
+
+    def __getstate__(self):
+        state = self.to_representation()
+        state.update((key, getattr(self, key)) for key in ("account", "authorization_token") if hasattr(self, key))
+        return state
+
+    def __setstate__(self, state: dict):
+        self._extra = None
+        self.set_data(state)
+
+    @classmethod
+    def _record_fields(cls) -> tuple:
+        fields = cls.__dict__.get("_compiled_record_fields")
+        if fields is None:
+            fields = cls._compiled_record_fields = tuple(get_type_hints(cls.Fields))
+        return fields
+
+    def to_representation(self) -> dict:
+        representation = {key: getattr(self, key) for key in self._record_fields() if hasattr(self, key)}
+        representation.update(self._extra or {})
+        return representation
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__,
+                               ", ".join("{}={}".format(key, value) for key, value in self.to_representation().items()))
+
 
 class AbstractApiObjectMixin(AbstractApiObject):
 
@@ -59,7 +174,32 @@ class AbstractApiObjectMixin(AbstractApiObject):
         """
         raise NotImplementedError()
 
-    def _build_object(self, request: ApiRequest):
+    async def retrieve_async(self):
+        """
+        Retrieve general information about an object without blocking the event loop.
+        """
+        request = await AsyncApiRequest(**self._retrieve_request_arguments()).perform()
+        return self._build_retrieved(request)
+
+    def prepare_retrieve(self) -> PreparedRequest:
+        """
+        Prepare the request performed by `retrieve` without sending it, e.g. to execute it together with others in a
+        :class:`lemon_markets.common.batch.BatchExecutor`.
+        """
+        request = ApiRequest(**self._retrieve_request_arguments(), defer=True)
+        return PreparedRequest(request=request, build=self._build_retrieved)
+
+    def _retrieve_request_arguments(self) -> dict:
+        """
+        The arguments of the request performed by `retrieve`. Has to be implemented by subclass.
+        """
+        raise NotImplementedError()
+
+    def _build_retrieved(self, request: BaseApiRequest):
+        self.set_data(request.response)
+        return self
+
+    def _build_object(self, request: BaseApiRequest):
         response_copy = request.response.copy()
         if request._account:
             response_copy["account"] = request._account
@@ -82,21 +222,47 @@ class AbstractApiObjectMixin(AbstractApiObject):
 
 
 class ListIterator:
-    results: list = []
-    _request: ApiRequest
+    """
+    One page of a list endpoint. `results` holds the objects of this page only. Iterating over the ListIterator
+    yields the objects of all pages, following the pagination links of the API::
+
+        for order in Order.list(account=my_account):
+            print(order.status)
+
+    While the objects of one page are consumed, the next page is already fetched in the background. Only the current
+    and the next page are held in memory, so arbitrarily long histories can be streamed.
+    """
+    _results: list = None
+    _request: BaseApiRequest
     _object_class = None
 
-    def __init__(self, request: ApiRequest, object_class):
+    def __init__(self, request: BaseApiRequest, object_class):
         self._request = request
         self._object_class = object_class
 
-        if not type(self._request.response) == dict and not self._request.response.get("results"):
+        response = self._request.response
+        if not type(response) == dict and not response.get("results"):
             raise RestApiError(detail="Unexpected API response. Should be list.")
 
-        self.__build_results()
+    @property
+    def results(self) -> list:
+        """
+        The objects of this page, built on first access.
+        """
+        if self._results is None:
+            self.__build_results()
+        return self._results
+
+    @property
+    def raw_results(self) -> list:
+        """
+        The results of this page as returned by the API, without building objects.
+        """
+        return self._request.response.get("results", [])
 
     def __build_results(self):
         results = []
+        self._object_class._field_decoders()  # compile once before hydrating the page
         for response_item in self._request.response.get("results", []):
             response_copy = response_item.copy()
 
@@ -108,20 +274,100 @@ class ListIterator:
                 response_copy["authorization_token"] = self._request.authorization_token
             results.append(self._object_class(**response_copy))
             # results.append(self._object_class().set_data(response_item))
-        self.results = results
+        self._results = results
 
-    def next(self):
-        pass
+    @property
+    def next_url(self) -> Optional[str]:
+        return self._request.response.get("next")
+
+    @property
+    def has_next(self) -> bool:
+        return bool(self.next_url)
+
+    def _next_request_arguments(self) -> dict:
+        return {
+            "endpoint": self.next_url,
+            "method": "GET",
+            "account": self._request._account,
+            "authorization_token": self._request.authorization_token,
+            "timeout": self._request._kwargs.get("timeout"),
+        }
+
+    def next(self) -> Optional["ListIterator"]:
+        """
+        Fetch the next page.
+
+        :return: the next page, or None if this is the last one
+        """
+        if not self.has_next:
+            return None
+        request = ApiRequest(**self._next_request_arguments())
+        return ListIterator(request=request, object_class=self._object_class)
+
+    async def next_async(self) -> Optional["ListIterator"]:
+        """
+        Fetch the next page without blocking the event loop.
+
+        :return: the next page, or None if this is the last one
+        """
+        if not self.has_next:
+            return None
+        request = await AsyncApiRequest(**self._next_request_arguments()).perform()
+        return ListIterator(request=request, object_class=self._object_class)
+
+    def pages(self) -> Iterator["ListIterator"]:
+        """
+        Iterate over this and all following pages, fetching the next page in the background.
+        """
+        page = self
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            while page is not None:
+                upcoming = prefetcher.submit(page.next) if page.has_next else None
+                yield page
+                page = upcoming.result() if upcoming is not None else None
+
+    def __iter__(self) -> Iterator:
+        for page in self.pages():
+            yield from page.results
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """
+        Fetch this and all following pages into one numpy array per field, without building an object per row, e.g.
+        ``M1.list(instrument=isin).to_numpy()["close"]``. Timestamps are int64 milliseconds since the epoch. See
+        :mod:`lemon_markets.common.columnar`.
+        """
+        return columnar.to_numpy(self._object_class, (page.raw_results for page in self.pages()))
+
+    def to_arrow(self) -> "pyarrow.Table":
+        """
+        Fetch this and all following pages into an arrow table, without building an object per row. See
+        :mod:`lemon_markets.common.columnar`.
+        """
+        return columnar.to_arrow(self._object_class, (page.raw_results for page in self.pages()))
+
+    async def __aiter__(self) -> AsyncIterator:
+        page = self
+        while page is not None:
+            upcoming = asyncio.ensure_future(page.next_async()) if page.has_next else None
+            try:
+                for item in page.results:
+                    yield item
+            except BaseException:
+                if upcoming is not None:
+                    upcoming.cancel()
+                raise
+            page = await upcoming if upcoming is not None else None
 
 
 class ListMixin:
+    __slots__ = ()
     _list_endpoint: str = ""
 
     @staticmethod
     def _build_query_params(**kwargs) -> dict:
         params = {}
         for param, value in kwargs.items():
-            if param in ("authorization_token", "account", "list_endpoint"):
+            if param in ("authorization_token", "account", "list_endpoint", "timeout"):
                 continue
 
             if type(value) == list and value:
@@ -145,6 +391,18 @@ class ListMixin:
 
     @staticmethod
     def list(object_class: Any, **kwargs) -> ListIterator:
+        request = ApiRequest(**ListMixin._build_list_request_arguments(object_class, **kwargs))
+        iterator = ListIterator(request=request, object_class=object_class)
+        return iterator
+
+    @staticmethod
+    async def list_async(object_class: Any, **kwargs) -> ListIterator:
+        request = await AsyncApiRequest(**ListMixin._build_list_request_arguments(object_class, **kwargs)).perform()
+        iterator = ListIterator(request=request, object_class=object_class)
+        return iterator
+
+    @staticmethod
+    def _build_list_request_arguments(object_class: Any, **kwargs) -> dict:
         query_dict = ListMixin._build_query_params(**kwargs)
 
         request_arguments = {
@@ -161,6 +419,7 @@ class ListMixin:
         if kwargs.get("authorization_token"):
             request_arguments["authorization_token"] = kwargs["authorization_token"]
 
-        request = ApiRequest(**request_arguments)
-        iterator = ListIterator(request=request, object_class=object_class)
-        return iterator
+        if kwargs.get("timeout"):
+            request_arguments["timeout"] = kwargs["timeout"]
+
+        return request_arguments
@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+from lemon_markets.settings import DEFAULT_RATE_LIMITS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens are refilled continuously at `rate` per second up to `capacity`.
+
+    :param rate: tokens per second, None means unlimited
+    :param capacity: maximum number of tokens, i.e. the allowed burst. Defaults to `rate`
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate or 1, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take `tokens` from the bucket and return the number of seconds the caller has to wait before using them. The
+        tokens are reserved immediately, so concurrent callers queue up behind each other instead of all waking up at
+        the same time.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._blocked_until - now, 0.0)
+            if self.rate is None:
+                return delay
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def acquire(self, tokens: float = 1):
+        """
+        Take `tokens` from the bucket, blocking until they are available.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def block(self, seconds: float):
+        """
+        Let no one pass for `seconds`, e.g. because the server answered with 429 Too Many Requests.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """
+    Client side rate limiting shared by all requests, with a separate :class:`TokenBucket` per endpoint group. All
+    market data endpoints (below ``data/``) form the group ``"data"``, everything else the group ``"trading"``.
+
+    :param trading: (requests per second, burst) for the trading endpoints, None means no limit
+    :param data: (requests per second, burst) for the market data endpoints, None means no limit
+    """
+    TRADING = "trading"
+    DATA = "data"
+
+    def __init__(self, trading: Optional[Tuple[float, float]] = DEFAULT_RATE_LIMITS["trading"],
+                 data: Optional[Tuple[float, float]] = DEFAULT_RATE_LIMITS["data"]):
+        self._buckets = {
+            self.TRADING: TokenBucket(*(trading or ())),
+            self.DATA: TokenBucket(*(data or ())),
+        }
+
+    @classmethod
+    def group_of(cls, url: str) -> str:
+        if "/data/" in urlparse(url).path:
+            return cls.DATA
+        return cls.TRADING
+
+    def reserve(self, url: str) -> float:
+        """
+        Reserve a request to `url` and return the number of seconds to wait before sending it.
+        """
+        return self._buckets[self.group_of(url)].reserve()
+
+    def acquire(self, url: str):
+        """
+        Block until a request to `url` may be sent.
+        """
+        self._buckets[self.group_of(url)].acquire()
+
+    def block(self, url: str, seconds: float):
+        """
+        Hold back all requests of the endpoint group of `url` for `seconds`.
+        """
+        self._buckets[self.group_of(url)].block(seconds)
+
+
+_rate_limiter: RateLimiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the rate limiter used by all requests, creating it with the default settings on first use.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def configure_rate_limiter(trading: Optional[Tuple[float, float]] = DEFAULT_RATE_LIMITS["trading"],
+                           data: Optional[Tuple[float, float]] = DEFAULT_RATE_LIMITS["data"]) -> RateLimiter:
+    """
+    Replace the rate limiter used by all requests, e.g. ``configure_rate_limiter(trading=(10, 20), data=(50, 100))``
+    to allow 10 trading requests per second with bursts of 20 and 50 market data requests per second with bursts of
+    100.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = RateLimiter(trading=trading, data=data)
+    return _rate_limiter
@@ -1,11 +1,20 @@
-import json
+import threading
+import time
 from json import JSONDecodeError
-from typing import Union
+from typing import Mapping, Optional, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
-from lemon_markets.common.errors import BaseError
-from lemon_markets.settings import DEFAULT_REST_API_URL
+from lemon_markets.common import encoding
+from lemon_markets.common.cache import VALIDATOR_HEADERS, ResponseCache, get_response_cache
+from lemon_markets.common.errors import BaseError, RestApiError
+from lemon_markets.common.ratelimit import get_rate_limiter
+from lemon_markets.common.retry import get_retry_policy, parse_retry_after
+from lemon_markets.common.singleflight import get_single_flight
+from lemon_markets.settings import DEFAULT_REST_API_URL, DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, \
+    DEFAULT_POOL_BLOCK
 
 
 class ApiResponseError(BaseError):
@@ -13,7 +22,7 @@ class ApiResponseError(BaseError):
     def __init__(self, detail: str, status: int):
         try:
             self.status = status
-            self.detail = json.loads(detail)
+            self.detail = encoding.loads(detail)
         except JSONDecodeError:
             self.detail = detail
 
@@ -22,10 +31,15 @@ class ApiResponseError(BaseError):
                                                                                                  str(self.detail))
 
 
+_decode_lock = threading.Lock()
+
+
 class ApiResponse:
     content: dict = None
     status: int = 0
     _is_success: bool = True
+    _decoded = None
+    _is_decoded: bool = False
 
     def __init__(self, content: Union[str, dict], status: int, is_success: bool, raise_error: bool = True):
         self.content = content
@@ -34,6 +48,26 @@ class ApiResponse:
         if raise_error and not is_success:
             raise ApiResponseError(content, status)
 
+    @property
+    def decoded(self):
+        """
+        The decoded body. It is decoded on first access only, later accesses (from any thread) return the same object.
+        """
+        if not self._is_decoded:
+            decoded = encoding.loads(self.content) if self.content else self.content
+            with _decode_lock:
+                if not self._is_decoded:
+                    self._decoded = decoded
+                    self._is_decoded = True
+        return self._decoded
+
+    def copy(self) -> "ApiResponse":
+        """
+        A response with the same body which decodes it again, so changes to the decoded body of one do not show in the
+        other. Used to hand out cached responses.
+        """
+        return ApiResponse(content=self.content, status=self.status, is_success=True)
+
     @property
     def successful(self):
         return self._is_success
@@ -43,14 +77,94 @@ class ApiResponse:
         return not self._is_success
 
 
-class ApiRequest:
+class SessionPool:
+    """
+    Keep-alive connection pool shared by every :class:`ApiRequest`.
+
+    All sessions mount the same :class:`requests.adapters.HTTPAdapter`, so the underlying urllib3 pools (and their
+    open TCP/TLS connections) are shared between threads. Every thread gets its own lightweight
+    :class:`requests.Session` on top of it, as sessions themselves are not guaranteed to be thread-safe.
+
+    :param pool_connections: number of hosts to keep a connection pool for
+    :param pool_maxsize: maximum number of keep-alive connections per host
+    :param pool_block: if True, wait for a free connection once a host pool is exhausted instead of opening a
+        connection which is discarded afterwards
+    """
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 pool_block: bool = DEFAULT_POOL_BLOCK):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                    pool_block=pool_block)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["Connection"] = "keep-alive"
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
+    def close(self):
+        """
+        Close all pooled connections. Sessions handed out before will open new connections if used again.
+        """
+        self._adapter.close()
+
+
+_session_pool: SessionPool = None
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """
+    Return the pool used by all requests, creating it with the default settings on first use.
+    """
+    global _session_pool
+    if _session_pool is None:
+        with _session_pool_lock:
+            if _session_pool is None:
+                _session_pool = SessionPool()
+    return _session_pool
+
+
+def configure_session_pool(pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                           pool_block: bool = DEFAULT_POOL_BLOCK) -> SessionPool:
+    """
+    Replace the pool used by all requests, e.g. to allow more parallel connections per host. Connections of the
+    previous pool are closed.
+    """
+    global _session_pool
+    with _session_pool_lock:
+        previous = _session_pool
+        _session_pool = SessionPool(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                    pool_block=pool_block)
+    if previous is not None:
+        previous.close()
+    return _session_pool
+
+
+class BaseApiRequest:
+    """
+    Holds everything needed to send a request to the REST API. The transport is implemented by the subclasses
+    :class:`ApiRequest` (blocking) and :class:`lemon_markets.common.async_requests.AsyncApiRequest` (asyncio).
+    """
     url: str
+    endpoint: str = None
     method: str = "GET"
     body: dict
-    authorization_token: str
+    authorization_token: str = None
     _account: "Account" = None
     _kwargs: dict
     _response: ApiResponse
+    _cache_key: tuple = None
+    _cache_ttl: float = None
 
     def __init__(self, endpoint: str, method: str = "GET", body: dict = None,
                  authorization_token: Union[str, "Token"] = None, url_params: dict = {}, **kwargs):
@@ -68,34 +182,168 @@ class ApiRequest:
         self.body = body
         self._build_url(endpoint)
 
-        self._perform_request()
-
     def _build_url(self, endpoint: str):
+        if endpoint.startswith(("https://", "http://")):
+            # absolute urls, e.g. pagination links returned by the API, are used as they are
+            self.url = endpoint
+            return
         url = ""
         if not self._kwargs.get("ignore_account_url", False) and self._account:
             account_url = "accounts/{}/".format(self._account.uuid)
             url += account_url
-        self.url = DEFAULT_REST_API_URL + url + endpoint
+        self.endpoint = url + endpoint
+        self.url = DEFAULT_REST_API_URL + self.endpoint
 
-    def _perform_request(self):
-        headers = {
+    def _build_headers(self) -> dict:
+        return {
             "Authorization": "Token {}".format(self.authorization_token)
         }
-        try:
-            if self.method == "post":
-                response = requests.post(self.url, json=self.body, headers=headers, params=self.url_params)
-            elif self.method == "delete":
-                response = requests.delete(self.url, headers=headers, params=self.url_params)
-            elif self.method == "patch":
-                response = requests.patch(self.url, data=self.body, headers=headers, params=self.url_params)
-            else:  # get
-                response = requests.get(self.url, headers=headers, params=self.url_params)
-            self._response = ApiResponse(content=response.content, status=response.status_code, is_success=response.ok)
-        except Exception as e:
-            raise e
+
+    def _cache_lookup(self, headers: dict) -> Optional[ApiResponse]:
+        """
+        Return a copy of the cached response if it is still fresh. Otherwise add the validators of a stale cached
+        response to `headers`, so the server can answer with 304 Not Modified. Pass `cache=False` to a request to
+        bypass the cache.
+        """
+        if self.method != "get" or not self._kwargs.get("cache", True):
+            return None
+        cache = get_response_cache()
+        self._cache_ttl = cache.ttl_for(self.endpoint)
+        if self._cache_ttl is None:
+            return None
+        self._cache_key = cache.key(self.url, self.url_params, self.authorization_token)
+        entry = cache.get(self._cache_key)
+        if entry is None:
+            return None
+        if entry.fresh:
+            return entry.response.copy()
+        headers.update(entry.validators())
+        return None
+
+    @staticmethod
+    def _without_validators(headers: dict) -> dict:
+        """
+        The headers of a conditional request without its validators. Raises an error if there are none, i.e. the server
+        answered 304 Not Modified to an unconditional request.
+        """
+        if not any(name in headers for name in VALIDATOR_HEADERS):
+            raise ApiResponseError("Not Modified, but no cached response to use", 304)
+        return {name: value for name, value in headers.items() if name not in VALIDATOR_HEADERS}
+
+    def _build_response(self, content: bytes, status: int, is_success: bool,
+                        headers: Mapping[str, str]) -> Optional[ApiResponse]:
+        """
+        The response of the request, stored in the cache if it is cacheable. None if the server answered 304 Not
+        Modified but the cached response has been evicted in the meantime; the request has to be repeated without
+        validators then (see :meth:`_without_validators`).
+        """
+        if self._cache_key is None:
+            return ApiResponse(content=content, status=status, is_success=is_success)
+        cache = get_response_cache()
+        if status == 304:
+            cached = cache.revalidate(self._cache_key, self._cache_ttl, headers)
+            return cached.copy() if cached is not None else None
+        response = ApiResponse(content=content, status=status, is_success=is_success)
+        if 200 <= status < 300:
+            cache.store(self._cache_key, response, self._cache_ttl, headers)
+        return response
+
+    @property
+    def executed(self) -> bool:
+        return hasattr(self, "_response")
 
     @property
     def response(self):
-        if self._response.content:
-            return json.loads(self._response.content)
-        return self._response.content
+        if not self.executed:
+            raise RestApiError(detail="The request has not been performed yet.")
+        return self._response.decoded
+
+
+class ApiRequest(BaseApiRequest):
+    """
+    A request sent using the shared :class:`SessionPool`. It is sent as soon as it is instantiated, unless `defer` is
+    set. A deferred request is sent by calling :meth:`execute`, e.g. by a
+    :class:`lemon_markets.common.batch.BatchExecutor`. Pass `timeout` to limit the seconds every attempt waits for the
+    server, there is no limit by default.
+    """
+
+    def __init__(self, endpoint: str, method: str = "GET", body: dict = None,
+                 authorization_token: Union[str, "Token"] = None, url_params: dict = {}, defer: bool = False,
+                 **kwargs):
+        super().__init__(endpoint=endpoint, method=method, body=body, authorization_token=authorization_token,
+                         url_params=url_params, **kwargs)
+
+        if not defer:
+            self._perform_request()
+
+    def execute(self) -> "ApiRequest":
+        self._perform_request()
+        return self
+
+    def _send(self, session: requests.Session, headers: dict) -> requests.Response:
+        timeout = self._kwargs.get("timeout")
+        if self.method == "post":
+            return session.post(self.url, json=self.body, headers=headers, params=self.url_params, timeout=timeout)
+        elif self.method == "delete":
+            return session.delete(self.url, headers=headers, params=self.url_params, timeout=timeout)
+        elif self.method == "patch":
+            return session.patch(self.url, data=self.body, headers=headers, params=self.url_params, timeout=timeout)
+        else:  # get
+            return session.get(self.url, headers=headers, params=self.url_params, timeout=timeout)
+
+    @staticmethod
+    def _is_connect_error(error: Exception) -> bool:
+        # True if the connection could not be established, i.e. the request was not sent at all
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+        return False
+
+    def _perform_request(self):
+        headers = self._build_headers()
+        cached = self._cache_lookup(headers)
+        if cached is not None:
+            self._response = cached
+            return
+        if self.method == "get" and self._kwargs.get("single_flight", True):
+            # identical GET requests in flight at the same time share one call and one response. Pass
+            # `single_flight=False` to a request to always send it
+            key = ResponseCache.key(self.url, self.url_params, self.authorization_token)
+            self._response = get_single_flight().do(key, lambda: self._fetch(headers))
+        else:
+            self._response = self._fetch(headers)
+
+    def _fetch(self, headers: dict) -> ApiResponse:
+        session = get_session_pool().session
+        rate_limiter = get_rate_limiter()
+        retry_policy = get_retry_policy()
+        attempt = 0
+        while True:
+            rate_limiter.acquire(self.url)
+            try:
+                response = self._send(session, headers)
+            except requests.exceptions.RequestException as e:
+                if not retry_policy.should_retry(self.method, attempt, error=e,
+                                                 request_sent=not self._is_connect_error(e)):
+                    raise e
+                time.sleep(retry_policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if retry_policy.should_retry(self.method, attempt, status=response.status_code):
+                backoff = retry_policy.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                if response.status_code == 429:
+                    # hold back all requests of this endpoint group, not just this one
+                    rate_limiter.block(self.url, backoff)
+                else:
+                    time.sleep(backoff)
+                attempt += 1
+                continue
+
+            built = self._build_response(content=response.content, status=response.status_code,
+                                         is_success=response.ok, headers=response.headers)
+            if built is None:  # the cached response was evicted before the server confirmed it
+                headers = self._without_validators(headers)
+                continue
+            return built
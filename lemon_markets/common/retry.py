@@ -0,0 +1,105 @@
+import datetime
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from lemon_markets.settings import DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_BACKOFF
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :return: the number of seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait before doing so.
+
+    Idempotent requests (GET, DELETE, ...) are retried on connection errors, 429 Too Many Requests and 5xx
+    responses. Requests which are not idempotent (POST, PATCH), e.g. placing an order, are only retried if the server
+    cannot have processed them: on 429 and on errors while connecting. This way an order is never submitted twice.
+
+    The wait grows exponentially with jitter, unless the server sends a Retry-After header, which is honoured.
+
+    :param max_retries: maximum number of retries per request, 0 disables retrying
+    :param backoff_factor: the n-th retry waits between half and all of ``backoff_factor * 2 ** n`` seconds
+    :param max_backoff: upper bound of a single wait, unless the server asks for more via Retry-After
+    """
+    retry_statuses = frozenset((429, 500, 502, 503, 504))
+    idempotent_methods = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def should_retry(self, method: str, attempt: int, status: int = None, error: Exception = None,
+                     request_sent: bool = True) -> bool:
+        """
+        :param method: the HTTP method of the request
+        :param attempt: number of retries done so far
+        :param status: the response status, if a response was received
+        :param error: the exception raised while sending the request, if any
+        :param request_sent: False if the error happened before the request was sent, i.e. while connecting
+        """
+        if attempt >= self.max_retries:
+            return False
+        if method.upper() in self.idempotent_methods:
+            return error is not None or status in self.retry_statuses
+        return (error is not None and not request_sent) or status == 429
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        The number of seconds to wait before the retry following `attempt` retries.
+        """
+        if retry_after is not None:
+            return retry_after
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+_retry_policy: RetryPolicy = None
+_retry_policy_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Return the retry policy used by all requests, creating it with the default settings on first use.
+    """
+    global _retry_policy
+    if _retry_policy is None:
+        with _retry_policy_lock:
+            if _retry_policy is None:
+                _retry_policy = RetryPolicy()
+    return _retry_policy
+
+
+def configure_retry_policy(max_retries: int = DEFAULT_MAX_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+                           max_backoff: float = DEFAULT_MAX_BACKOFF) -> RetryPolicy:
+    """
+    Replace the retry policy used by all requests. ``configure_retry_policy(max_retries=0)`` disables retrying.
+    """
+    global _retry_policy
+    with _retry_policy_lock:
+        _retry_policy = RetryPolicy(max_retries=max_retries, backoff_factor=backoff_factor, max_backoff=max_backoff)
+    return _retry_policy
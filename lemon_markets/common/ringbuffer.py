@@ -0,0 +1,270 @@
+"""
+A ring buffer of fixed size records in shared memory, written by one process and read by another without pickling
+anything per record. Used by the streams to deliver ticks and quotes from their process to the parent process.
+
+Requires numpy and Python 3.8 or newer (:mod:`multiprocessing.shared_memory`).
+"""
+import multiprocessing
+import operator
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    resource_tracker = shared_memory = None
+
+from lemon_markets.common import columnar
+from lemon_markets.common.errors import MissingDependencyError
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "conflate")
+
+# seconds to wait between checks for space (writer) or records (reader) if the other side did not signal
+RETRY_INTERVAL = 0.05
+
+# the header is 16 uint64 values, the ones written by the reader on another cache line than the ones of the writer.
+# It is accessed as memoryview, which is several times faster than indexing a numpy array for single values
+HEADER_SIZE = 128
+_HEAD, _CONFLATED, _WRITER_WAITING = 0, 1, 2
+_TAIL, _READER_WAITING, _CLOSED = 8, 9, 10
+
+
+def require_shared_memory():
+    columnar.require_numpy()
+    if shared_memory is None:
+        raise MissingDependencyError(detail="Python 3.8 or newer is required for shared memory buffers.")
+
+
+def _attach_shared_memory(name: str) -> "shared_memory.SharedMemory":
+    # only the creating process unlinks the memory, attaching must not leave that to a resource tracker as well
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # processes started by multiprocessing (fork, spawn and forkserver) share the resource tracker of their parent, so
+    # the registration of the attachment is the one of the creating process. Only a process without a tracker starts
+    # one of its own when attaching, which would unlink the memory when this process exits
+    own_tracker = resource_tracker._resource_tracker._fd is None
+    shm = shared_memory.SharedMemory(name=name)
+    if own_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class RingBuffer:
+    """
+    A single producer, single consumer ring buffer of `capacity` records of `dtype` in shared memory. The instance is
+    created by the reading process and passed (pickled) to the writing process, which attaches to the same memory.
+
+    `overflow` decides what the writer does if the reader fell behind and the buffer is full:
+
+    - ``"block"``: wait until the reader made space, nothing is lost
+    - ``"drop_oldest"``: overwrite the oldest records, the reader skips them and counts them in :attr:`dropped`
+    - ``"conflate"``: keep only the newest record per `key` until there is space again, counted in :attr:`conflated`
+
+    :param dtype: the numpy record type
+    :param capacity: the number of records the buffer holds
+    :param overflow: the policy if the buffer is full, see above
+    :param key: the field records are conflated by
+    """
+
+    def __init__(self, dtype, capacity: int, overflow: str = "block", key: str = "isin"):
+        require_shared_memory()
+        assert overflow in OVERFLOW_POLICIES, 'Unsupported overflow policy!'
+        self._dtype = columnar.numpy.dtype(list(dtype) if isinstance(dtype, tuple) else dtype)
+        self._capacity = capacity
+        self._overflow = overflow
+        self._key = key
+        self._data_ready = multiprocessing.Event()
+        self._space_ready = multiprocessing.Event()
+        self._shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * self._dtype.itemsize)
+        # the process which unlinks the memory, a process forked from it inherits the instance without pickling
+        self._owner = os.getpid()
+        self._attach()
+
+    def _attach(self):
+        numpy = columnar.numpy
+        self._header = self._shm.buf[:HEADER_SIZE].cast("Q")
+        self._records = numpy.ndarray((self._capacity,), dtype=self._dtype, buffer=self._shm.buf, offset=HEADER_SIZE)
+        # reader: the end of the records handed out by the last read, released by the next one
+        self._handed = self._header[_TAIL]
+        self.dropped = 0
+        # writer: records waiting for space by key (conflate), and the string fields (numpy stores None as "None")
+        self._pending: Dict[Any, tuple] = {}
+        self._key_index = self._dtype.names.index(self._key) if self._key in self._dtype.names else 0
+        self._string_fields = [i for i, name in enumerate(self._dtype.names) if self._dtype[name].kind == "S"]
+        self._get_fields = operator.attrgetter(*self._dtype.names)
+
+    def __getstate__(self):
+        return {"name": self._shm.name, "dtype": self._dtype, "capacity": self._capacity, "overflow": self._overflow,
+                "key": self._key, "data_ready": self._data_ready, "space_ready": self._space_ready}
+
+    def __setstate__(self, state: dict):
+        self._dtype = state["dtype"]
+        self._capacity = state["capacity"]
+        self._overflow = state["overflow"]
+        self._key = state["key"]
+        self._data_ready = state["data_ready"]
+        self._space_ready = state["space_ready"]
+        self._shm = _attach_shared_memory(state["name"])
+        self._owner = None
+        self._attach()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def overflow(self) -> str:
+        return self._overflow
+
+    @property
+    def conflated(self) -> int:
+        """
+        The number of records the writer replaced by a newer one of the same key (``"conflate"`` only).
+        """
+        return self._header[_CONFLATED]
+
+    def __len__(self) -> int:
+        # records written but not read yet
+        return self._header[_HEAD] - self._handed
+
+    # writer
+
+    def _full(self) -> bool:
+        return self._header[_HEAD] - self._header[_TAIL] >= self._capacity
+
+    def _write(self, record: tuple):
+        head = self._header[_HEAD]
+        self._records[head % self._capacity] = record
+        self._header[_HEAD] = head + 1
+        if self._header[_READER_WAITING]:
+            self._data_ready.set()
+
+    def _wait_for_space(self) -> bool:
+        # False if the reader closed the buffer while waiting
+        while self._full():
+            if self._header[_CLOSED]:
+                return False
+            self._header[_WRITER_WAITING] = 1
+            if self._full():
+                self._space_ready.wait(RETRY_INTERVAL)
+                self._space_ready.clear()
+        self._header[_WRITER_WAITING] = 0
+        return True
+
+    def flush(self) -> bool:
+        """
+        Write the conflated records for which there is space now. True if none are left waiting.
+        """
+        while self._pending and not self._full():
+            self._write(self._pending.pop(next(iter(self._pending))))
+        return not self._pending
+
+    def put(self, record: tuple) -> bool:
+        """
+        Write a record (a tuple in the order of the fields of the record type). False if it is waiting for space
+        (``"conflate"``) or the buffer was closed while waiting (``"block"``).
+        """
+        if self._overflow == "conflate":
+            if not self.flush() or self._full():
+                key = record[self._key_index]
+                if self._pending.pop(key, None) is not None:  # re-inserted, so they are written in order
+                    self._header[_CONFLATED] += 1
+                self._pending[key] = record
+                return False
+        elif self._overflow == "block" and self._full() and not self._wait_for_space():
+            return False
+        self._write(record)
+        return True
+
+    def put_item(self, item) -> bool:
+        """
+        Write the attributes of `item` named like the fields of the record type, e.g. of a
+        :class:`lemon_markets.data.streams.Tick`. Missing values (None) are stored as NaN or empty strings.
+        """
+        record = self._get_fields(item)
+        if not isinstance(record, tuple):  # a record type with a single field
+            record = (record,)
+        if None in record and self._string_fields:
+            record = list(record)
+            for i in self._string_fields:
+                if record[i] is None:
+                    record[i] = b""
+            record = tuple(record)
+        return self.put(record)
+
+    # reader
+
+    def _release(self):
+        self._header[_TAIL] = self._handed
+        if self._header[_WRITER_WAITING]:
+            self._space_ready.set()
+
+    def _wait_for_records(self, timeout: Optional[float]) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._header[_HEAD] == self._handed:
+            remaining = RETRY_INTERVAL if deadline is None else min(RETRY_INTERVAL, deadline - time.monotonic())
+            if remaining <= 0:
+                return False
+            self._header[_READER_WAITING] = 1
+            if self._header[_HEAD] == self._handed:
+                self._data_ready.wait(remaining)
+                self._data_ready.clear()
+        self._header[_READER_WAITING] = 0
+        return True
+
+    def read(self, max_records: int = None, timeout: Optional[float] = 0) -> "numpy.ndarray":
+        """
+        The next records, at most `max_records` and at most up to the end of the buffer (read again for the rest).
+
+        With ``"block"`` and ``"conflate"`` the result is a view of the shared memory, it is valid until the next call
+        of :meth:`read`, which releases its records to the writer. With ``"drop_oldest"`` the writer may overwrite
+        records at any time, so they are copied.
+
+        :param max_records: the maximum number of records returned
+        :param timeout: seconds to wait if there are no records, None to wait until there are
+        :return: a numpy structured array, empty if no records were written within `timeout`
+        """
+        self._release()
+        if not self._wait_for_records(timeout):
+            return self._records[:0]
+        head = self._header[_HEAD]
+        start = self._handed
+        if self._overflow == "drop_oldest" and head - start > self._capacity:
+            self.dropped += head - self._capacity - start
+            start = head - self._capacity
+        end = min(head, start - start % self._capacity + self._capacity)
+        if max_records is not None:
+            end = min(end, start + max_records)
+        records = self._records[start % self._capacity:start % self._capacity + end - start]
+        if self._overflow == "drop_oldest":
+            records = records.copy()
+            # records overwritten while they were copied, including the one the writer is writing right now
+            overwritten = max(0, self._header[_HEAD] + 1 - self._capacity - start)
+            self.dropped += min(overwritten, end - start)
+            records = records[overwritten:]
+        self._handed = end
+        if self._overflow == "drop_oldest":
+            self._release()
+        return records
+
+    def close(self):
+        """
+        Stop a writer waiting for space and free the shared memory (once all views of it are gone).
+        """
+        if self._header is None:
+            return
+        owner = self._owner == os.getpid()
+        if owner:
+            self._header[_CLOSED] = 1
+            self._space_ready.set()
+        self._header.release()
+        self._header = self._records = None
+        try:
+            self._shm.close()
+        except BufferError:  # records returned by read are still referenced
+            pass
+        if owner:
+            self._shm.unlink()
+            self._owner = None
@@ -0,0 +1,132 @@
+import asyncio
+import copy
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+
+def _own_error(error: BaseException) -> BaseException:
+    # every waiter raises its own instance, chained to the original: one instance raised in several threads or tasks
+    # gets its traceback and context overwritten by each of them
+    try:
+        copied = copy.copy(error)
+    except Exception:  # an error which cannot be rebuilt from its arguments
+        return error
+    copied.__cause__ = error
+    return copied
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls running at the same time: the first caller of :meth:`do` with a key runs the function,
+    every caller arriving with the same key while it is running waits for it and gets the same result (or error)
+    instead of running the function again.
+
+    Used by :class:`lemon_markets.common.requests.ApiRequest` for GET requests, so e.g. several threads asking for the
+    latest candle of the same instrument at the same time share one HTTP request and one decoded response.
+    :meth:`do_async` does the same for the coroutines of an event loop
+    (:class:`lemon_markets.common.async_requests.AsyncApiRequest`).
+
+    Waiters get a copy of the error of the call, chained to the original one.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        # event loop: {key: future of the running call}, futures are bound to the loop they were created in
+        self._async_calls = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.shared = 0  # number of calls which were answered by another caller's call
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _own_error(call.error)
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, function: Callable[[], Awaitable]) -> Any:
+        """
+        :meth:`do` for coroutines: the first caller with a key awaits ``function()``, callers of the same event loop
+        arriving while it is running await its result. A waiter which is cancelled does not cancel the call.
+        """
+        loop = asyncio.get_event_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+        while True:
+            future = calls.get(key)
+            if future is None:
+                break
+            with self._lock:
+                self.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():  # the waiter itself was cancelled
+                    raise
+                # the caller running the call was cancelled, the next one runs it again
+            except BaseException as e:
+                raise _own_error(e)
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await function()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved, the waiters raise copies of it
+            raise
+        finally:
+            del calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + sum(len(calls) for calls in self._async_calls.values())
+
+
+_single_flight: SingleFlight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Return the :class:`SingleFlight` used by all requests, creating it on first use.
+    """
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
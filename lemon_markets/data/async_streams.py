@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, Optional
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, install with `pip install lemon_markets[async]`
+    aiohttp = None
+
+from lemon_markets.common.async_requests import get_async_session_pool
+from lemon_markets.common.retry import get_retry_policy
+from lemon_markets.data.streams import MAX_RECONNECT_DOUBLINGS, BaseSerializer, Conflator, QuoteStream, TickStream
+
+
+class AsyncStreamBase:
+    """
+    Base class of the asyncio streams. A stream runs in the event loop of its caller, on the connection pool of the
+    asynchronous requests, instead of in a separate process like :class:`lemon_markets.data.streams.StreamBase`.
+
+    Subscriptions are sent on the open connection, without reconnecting. If no message is received for `timeout`
+    seconds, or the connection is closed, the stream reconnects and subscribes again. A failed reconnect is retried
+    after the backoff of the retry policy, growing with every failure. Messages which cannot be decoded, e.g. malformed
+    ones or error messages of the API, are skipped and counted in :attr:`dropped`. The last error, of a message or a
+    reconnect, is kept in :attr:`last_error`.
+
+    :param timeout: seconds without any message after which the stream reconnects
+    :param frequency_limit: if set, the minimum number of seconds between two messages of the same ISIN. Messages
+        received in between are conflated, only the most recent one is yielded
+    """
+    _serializer = _connect_url = _type = _specifiers = _default_specifier = None
+
+    def __init__(self, timeout: float = 10, frequency_limit: float = 0):
+        self._timeout = timeout
+        self._frequency_limit = frequency_limit
+        self._subscribed: Dict[str, str] = {}
+        self._ws: "aiohttp.ClientWebSocketResponse" = None
+        self._closed = False
+        self.dropped = 0
+        self.last_error: Optional[Exception] = None
+
+    async def __aenter__(self) -> "AsyncStreamBase":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        """
+        Open the connection and send all subscriptions, closing the previous connection if there is one.
+        """
+        if self._ws is not None:
+            await self._ws.close()
+        session, _ = get_async_session_pool().acquire()
+        self._ws = await session.ws_connect(self._connect_url)
+        self._closed = False
+        for isin, specifier in list(self._subscribed.items()):
+            await self._send_subscription("subscribe", isin, specifier)
+
+    async def close(self):
+        """
+        Close the connection. An ``async for`` loop over the stream ends afterwards.
+        """
+        self._closed = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _send_subscription(self, action: str, isin: str, specifier: str = None):
+        message = {"action": action, "type": self._type, "value": isin}
+        if specifier is not None:
+            message["specifier"] = specifier
+        await self._ws.send_str(json.dumps(message))
+
+    async def subscribe(self, isin: str, specifier: str = None):
+        if specifier is None:
+            specifier = self._default_specifier
+        assert specifier in self._specifiers, 'Unsupported specifier!'
+        if isin in self._subscribed:
+            return
+        self._subscribed[isin] = specifier
+        if self.connected:
+            await self._send_subscription("subscribe", isin, specifier)
+
+    async def unsubscribe(self, isin: str):
+        del self._subscribed[isin]
+        if self.connected:
+            await self._send_subscription("unsubscribe", isin)
+
+    async def _receive(self, timeout: float) -> Optional[str]:
+        # the next text message, None on timeout or if the connection was closed
+        try:
+            message = await self._ws.receive(timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message.type == aiohttp.WSMsgType.TEXT:
+            return message.data
+        if message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED,
+                            aiohttp.WSMsgType.ERROR):
+            await self._ws.close()
+        return None
+
+    def _serialize(self, message: str) -> Optional[BaseSerializer]:
+        try:
+            return self._serializer(message, self._subscribed)
+        except KeyError:  # a message of an ISIN which has just been unsubscribed
+            return None
+        except Exception as e:  # e.g. a StreamError or an invalid message, the stream process reconnects on these
+            self.dropped += 1
+            self.last_error = e
+            return None
+
+    async def _reconnect(self, attempt: int) -> bool:
+        # True once connected, after a failure waits before the next attempt
+        try:
+            await self.connect()
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.last_error = e
+            await asyncio.sleep(get_retry_policy().backoff(min(attempt, MAX_RECONNECT_DOUBLINGS)))
+            return False
+
+    async def __aiter__(self) -> AsyncIterator[BaseSerializer]:
+        conflator = Conflator(self._frequency_limit) if self._frequency_limit else None
+        last_received = time.monotonic()
+        attempt = 0
+        while not self._closed:
+            now = time.monotonic()
+            if conflator is not None:
+                for serialized in conflator.due(now):
+                    yield serialized
+            if not self.connected or now - last_received >= self._timeout:
+                attempt = 0 if await self._reconnect(attempt) else attempt + 1
+                last_received = time.monotonic()
+                continue
+
+            timeout = self._timeout - (now - last_received)
+            next_due = conflator.next_due(now) if conflator is not None else None
+            message = await self._receive(timeout if next_due is None else min(timeout, next_due))
+            if message is None:
+                continue
+            last_received = time.monotonic()
+            serialized = self._serialize(message)
+            if serialized is None:
+                continue
+            if conflator is None or conflator.offer(serialized.isin, serialized, last_received) is not None:
+                yield serialized
+
+
+class AsyncTickStream(AsyncStreamBase):
+    '''The asyncio counterpart of :class:`lemon_markets.data.streams.TickStream`, running in the caller's event loop::
+
+        async with AsyncTickStream() as stream:
+            await stream.subscribe("US88160R1014")
+            async for tick in stream:
+                if tick.price < 600:
+                    await Order(account=account, instrument=tick.isin, quantity=1, side="buy",
+                                type="market").create_async()
+
+    Args:
+        timeout (float, optional): How many seconds for no data has to be received to trigger an automatic reconnect. Default is 10
+        frequency_limit (float, optional): If set, the minimum number of seconds between two ticks of the same ISIN.
+            Ticks received in between are conflated, only the most recent one is yielded
+
+    Note:
+        Requires aiohttp (``pip install lemon_markets[async]``). Iterating yields
+        :class:`lemon_markets.data.streams.Tick` objects
+    '''
+    _connect_url = TickStream._connect_url
+    _type = TickStream._type
+    _serializer = TickStream._serializer
+    _specifiers = TickStream._specifiers
+    _default_specifier = TickStream._default_specifier
+
+
+class AsyncQuoteStream(AsyncStreamBase):
+    '''The asyncio counterpart of :class:`lemon_markets.data.streams.QuoteStream`, running in the caller's event loop
+
+    Args:
+        timeout (float, optional): How many seconds for no data has to be received to trigger an automatic reconnect. Default is 10
+        frequency_limit (float, optional): If set, the minimum number of seconds between two quotes of the same ISIN.
+            Quotes received in between are conflated, only the most recent one is yielded
+
+    Note:
+        Requires aiohttp (``pip install lemon_markets[async]``). Iterating yields
+        :class:`lemon_markets.data.streams.Quote` objects
+    '''
+    _connect_url = QuoteStream._connect_url
+    _type = QuoteStream._type
+    _serializer = QuoteStream._serializer
+    _specifiers = QuoteStream._specifiers
+    _default_specifier = QuoteStream._default_specifier
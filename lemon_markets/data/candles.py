@@ -0,0 +1,156 @@
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Union
+
+from lemon_markets.common import columnar
+from lemon_markets.data.ohlc import OHLCObject
+
+RESOLUTIONS = {
+    # name: length of a candle in seconds
+    "m1": 60,
+    "m5": 5 * 60,
+    "m15": 15 * 60,
+    "h1": 60 * 60,
+    "d1": 24 * 60 * 60,
+}
+
+CANDLE_COLUMNS = ("open", "high", "low", "close", "date")
+
+
+def resolution_seconds(resolution: Union[str, int]) -> int:
+    """
+    The length of a candle of `resolution` in seconds. `resolution` is one of :data:`RESOLUTIONS` or a number of
+    seconds.
+    """
+    if isinstance(resolution, str):
+        try:
+            return RESOLUTIONS[resolution.lower()]
+        except KeyError:
+            raise ValueError("Unknown resolution '{}', expected one of {}.".format(resolution, ", ".join(RESOLUTIONS)))
+    return int(resolution)
+
+
+def resample(candles: Mapping[str, "numpy.ndarray"], resolution: Union[str, int]) -> Dict[str, "numpy.ndarray"]:
+    """
+    Aggregate candles into candles of a coarser `resolution`, e.g. M1 candles into H1 candles::
+
+        hourly = resample(M1.list("US88160R1014", ordering="date").to_numpy(), "h1")
+
+    Candles are grouped by the (UTC) interval their date falls into, the date of a resampled candle is the start of
+    its interval. The grouping is done on whole arrays, without a Python loop per candle.
+
+    Candles without a date are left out. Candles which are not ordered by date (e.g. listed with the default ordering
+    ``"-date"``) are sorted first.
+
+    :param candles: the columns of candles, with dates as milliseconds since the epoch, as returned by
+        :meth:`lemon_markets.common.objects.ListIterator.to_numpy`,
+        :meth:`lemon_markets.data.history.HistoryDownloader.load` or :meth:`lemon_markets.data.store.CandleStore.read`
+    :param resolution: one of :data:`RESOLUTIONS` or the length of a resampled candle in seconds
+    """
+    columnar.require_numpy()
+    numpy = columnar.numpy
+    length = resolution_seconds(resolution) * 1000
+    # rows without a date cannot be grouped, their masked dates would be 0
+    candles = columnar.drop_missing({key: candles[key] for key in CANDLE_COLUMNS}, "date")
+    dates = numpy.asarray(candles["date"])
+    if not len(dates):
+        return {key: numpy.asarray(candles[key])[:0] for key in CANDLE_COLUMNS}
+    if (dates[1:] < dates[:-1]).any():
+        order = numpy.argsort(dates, kind="stable")
+        candles = {key: numpy.asarray(column)[order] for key, column in candles.items()}
+        dates = dates[order]
+
+    intervals = dates // length
+    starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.diff(intervals)) + 1))
+    ends = numpy.concatenate((starts[1:], [len(dates)])) - 1
+    return {
+        "open": numpy.asarray(candles["open"])[starts],
+        "high": numpy.maximum.reduceat(numpy.asarray(candles["high"]), starts),
+        "low": numpy.minimum.reduceat(numpy.asarray(candles["low"]), starts),
+        "close": numpy.asarray(candles["close"])[ends],
+        "date": intervals[starts] * length,
+    }
+
+
+class CandleBuilder:
+    """
+    Builds candles from ticks as they arrive, e.g. from a :class:`lemon_markets.data.streams.TickStream`::
+
+        def on_candle(isin, candle):
+            print(isin, candle.close)
+
+        builder = CandleBuilder("m5", on_candle=on_candle)
+        stream = TickStream(callback=builder.update)
+
+    Every tick updates the still forming candle of its instrument in constant time. A candle is completed (and
+    passed to `on_candle`) by the first tick of a later interval, or by :meth:`close_until` for instruments that
+    stopped trading. Ticks arriving after their candle was completed are ignored.
+
+    Note:
+        Stream callbacks are called in the process of the stream, so are the builder and `on_candle`.
+
+    :param resolution: one of :data:`RESOLUTIONS` or the length of a candle in seconds
+    :param on_candle: called with the ISIN and the :class:`lemon_markets.data.ohlc.OHLCObject` of every completed
+        candle
+    """
+
+    def __init__(self, resolution: Union[str, int] = "m1", on_candle: Callable[[str, OHLCObject], Any] = None):
+        self.length = resolution_seconds(resolution)
+        self.on_candle = on_candle
+        # isin: [interval, open, high, low, close] of the forming candle
+        self._candles: Dict[str, list] = {}
+        # isin: interval of the last candle completed by close_until
+        self._closed: Dict[str, int] = {}
+
+    def update(self, tick: "Tick"):
+        """
+        Add a :class:`lemon_markets.data.streams.Tick`.
+        """
+        self.add(tick.isin, tick.price, tick.timestamp)
+
+    def add(self, isin: str, price: float, timestamp: float):
+        """
+        Add a trade of `isin` at `price`, `timestamp` being seconds since the epoch.
+        """
+        interval = int(timestamp // self.length)
+        candle = self._candles.get(isin)
+        if candle is None and interval <= self._closed.get(isin, interval - 1):
+            return
+        if candle is None or interval > candle[0]:
+            self._candles[isin] = [interval, price, price, price, price]
+            if candle is not None:
+                self._complete(isin, candle)
+        elif interval == candle[0]:
+            if price > candle[2]:
+                candle[2] = price
+            elif price < candle[3]:
+                candle[3] = price
+            candle[4] = price
+
+    def _build(self, candle: list) -> OHLCObject:
+        return OHLCObject(open=candle[1], high=candle[2], low=candle[3], close=candle[4],
+                          date=float(candle[0] * self.length))
+
+    def _complete(self, isin: str, candle: list):
+        if self.on_candle is not None:
+            self.on_candle(isin, self._build(candle))
+
+    def current(self, isin: str) -> Optional[OHLCObject]:
+        """
+        The still forming candle of `isin`, None if no tick has been added yet.
+        """
+        candle = self._candles.get(isin)
+        return self._build(candle) if candle is not None else None
+
+    def close_until(self, timestamp: float = None):
+        """
+        Complete the candles of all instruments whose interval ended at `timestamp` (seconds since the epoch, now if
+        not set), even though no tick of a later interval has arrived yet.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        interval = int(timestamp // self.length)
+        for isin, candle in list(self._candles.items()):
+            if candle[0] < interval:
+                del self._candles[isin]
+                self._closed[isin] = candle[0]
+                self._complete(isin, candle)
@@ -0,0 +1,152 @@
+import datetime
+import time
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from lemon_markets.common.batch import BatchExecutor
+from lemon_markets.common.objects import UTC, ListMixin
+from lemon_markets.settings import DEFAULT_BATCH_MAX_WORKERS
+
+
+def _key(serialized) -> Tuple[int, Optional[float]]:
+    # identifies a tick in the stream and in the history: millisecond and price
+    return round(serialized.timestamp * 1000), getattr(serialized, "price", None)
+
+
+class _TradesBackfill:
+    # the trades of one instrument in a gap, as job of the BatchExecutor
+    def __init__(self, backfill_class, isin: str, since: float, until: float, authorization_token: str,
+                 timeout: Optional[float]):
+        self.backfill_class = backfill_class
+        self.isin = isin
+        self.since = since
+        self.until = until
+        self.authorization_token = authorization_token
+        self.timeout = timeout
+
+    def execute(self) -> list:
+        return list(ListMixin.list(ordering="date",
+                                   date_from=datetime.datetime.fromtimestamp(self.since, tz=UTC),
+                                   date_until=datetime.datetime.fromtimestamp(self.until, tz=UTC),
+                                   authorization_token=self.authorization_token,
+                                   timeout=self.timeout,
+                                   list_endpoint=self.backfill_class._build_endpoint(instrument=self.isin),
+                                   object_class=self.backfill_class))
+
+
+class GapTracker:
+    """
+    Detects the gaps a stream has while it reconnects and fills them from the history of the REST API. Used by the
+    stream process (:class:`lemon_markets.data.streams.WSWorker`).
+
+    The time of the last message of every ISIN is tracked. After a reconnect caused by a failed connection, the trades
+    since then are fetched with `backfill_class` (e.g. :class:`lemon_markets.data.ohlc.Trades`) and returned as
+    messages in the order of their dates. Messages received afterwards which are already part of the backfill are
+    recognized by :meth:`received`. A reconnect because the feed was quiet, while the connection still answered pings,
+    is no gap: nothing was missed.
+
+    :param serializer: the class of the messages, building them from history objects with ``from_trade``
+    :param backfill_class: the data class the history is fetched with, None to only measure gaps
+    :param authorization_token: the token of the history requests, None to only measure gaps
+    :param max_workers: the number of instruments fetched at the same time
+    :param request_timeout: the seconds every history request waits for the server, as the stream does not receive
+        anything while it backfills
+    """
+
+    def __init__(self, serializer, backfill_class=None, authorization_token: str = None,
+                 max_workers: int = DEFAULT_BATCH_MAX_WORKERS, request_timeout: Optional[float] = None):
+        self._serializer = serializer
+        self._backfill_class = backfill_class if authorization_token is not None else None
+        self._authorization_token = authorization_token
+        self._max_workers = max_workers
+        self._request_timeout = request_timeout
+        # isin: (timestamp, key) of the last message passed on
+        self._last: Dict[str, Tuple[float, tuple]] = {}
+        # isin: (end of the backfill, keys of the backfilled messages) until a newer message was received
+        self._backfilled: Dict[str, Tuple[float, Set[tuple]]] = {}
+        self._last_received: Optional[float] = None
+        self._connected = False
+        self.reconnects = 0
+        self.gap_seconds = 0.0
+        self.last_gap_seconds = 0.0
+        self.backfilled = 0
+        self.duplicates = 0
+        self.backfill_errors = 0
+
+    def touch(self):
+        """
+        Note that messages were received, without tracking them per ISIN.
+        """
+        self._last_received = time.time()
+
+    def received(self, serialized) -> bool:
+        """
+        Track a message received by the stream. False if it is a duplicate of a backfilled message.
+        """
+        self._last_received = time.time()
+        backfilled = self._backfilled.get(serialized.isin)
+        if backfilled is not None:
+            until, keys = backfilled
+            if serialized.timestamp > until:
+                del self._backfilled[serialized.isin]
+            elif _key(serialized) in keys:
+                self.duplicates += 1
+                return False
+        self._last[serialized.isin] = (serialized.timestamp, _key(serialized))
+        return True
+
+    def forget(self, isins: Iterable[str]):
+        """
+        Stop tracking unsubscribed ISINs, so they are not backfilled when subscribed again later.
+        """
+        for isin in isins:
+            self._last.pop(isin, None)
+            self._backfilled.pop(isin, None)
+
+    def connected(self, subscribed: Dict[str, str], failed: bool = True) -> list:
+        """
+        Called after every (re)connect. If the previous connection `failed`, measures the gap and returns the
+        backfilled messages of the subscribed ISINs, ordered by date.
+        """
+        if not self._connected:
+            self._connected = True
+            return []
+        self.reconnects += 1
+        if not failed:  # reconnected because no message was received for a while, but the connection was alive
+            return []
+        now = time.time()
+        self.last_gap_seconds = now - self._last_received if self._last_received is not None else 0.0
+        self.gap_seconds += self.last_gap_seconds
+        if self._backfill_class is None:
+            return []
+
+        jobs = [_TradesBackfill(self._backfill_class, isin, self._last[isin][0], now, self._authorization_token,
+                                self._request_timeout)
+                for isin in subscribed if isin in self._last]
+        messages = []
+        for job, result in zip(jobs, BatchExecutor(max_workers=self._max_workers).run(jobs)):
+            if not result.successful:
+                self.backfill_errors += 1
+                continue
+            messages.extend(self._backfill(job, result.value, subscribed[job.isin]))
+        messages.sort(key=lambda message: message.timestamp)
+        self.backfilled += len(messages)
+        return messages
+
+    def _backfill(self, job: _TradesBackfill, trades: list, specifier: str) -> list:
+        since, last_key = self._last[job.isin]
+        messages = [message for message in (self._serializer.from_trade(job.isin, trade, specifier) for trade in trades)
+                    if message.timestamp >= since and _key(message) != last_key]
+        if messages:
+            self._last[job.isin] = (messages[-1].timestamp, _key(messages[-1]))
+            self._backfilled[job.isin] = (job.until, {_key(message) for message in messages})
+        return messages
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "reconnects": self.reconnects,
+            "gap_seconds": self.gap_seconds,
+            "last_gap_seconds": self.last_gap_seconds,
+            "backfilled": self.backfilled,
+            "duplicates": self.duplicates,
+            "backfill_errors": self.backfill_errors,
+        }
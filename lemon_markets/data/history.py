@@ -0,0 +1,179 @@
+import datetime
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Union
+
+from lemon_markets.common import columnar
+from lemon_markets.common.batch import BatchExecutor
+from lemon_markets.data.ohlc import M1
+from lemon_markets.settings import DEFAULT_BATCH_MAX_WORKERS
+
+
+class HistoryChunk:
+    """
+    The data of one instrument in the time range [`date_from`, `date_until`).
+    """
+
+    def __init__(self, instrument: str, date_from: datetime.datetime, date_until: datetime.datetime):
+        self.instrument = instrument
+        self.date_from = date_from
+        self.date_until = date_until
+
+    @property
+    def key(self) -> str:
+        return "{}/{}-{}".format(self.instrument, int(self.date_from.timestamp()), int(self.date_until.timestamp()))
+
+    def __repr__(self):
+        return "HistoryChunk({})".format(self.key)
+
+
+class _ChunkDownload:
+    # a chunk as job of the BatchExecutor
+    def __init__(self, downloader: "HistoryDownloader", chunk: HistoryChunk):
+        self.downloader = downloader
+        self.chunk = chunk
+
+    def execute(self) -> HistoryChunk:
+        self.downloader._download(self.chunk)
+        return self.chunk
+
+
+class HistoryDownloader:
+    """
+    Downloads the history of many instruments concurrently into compressed numpy files (one ``.npz`` file per chunk,
+    holding the columns described in :mod:`lemon_markets.common.columnar`).
+
+    The requested time range is split into chunks of `chunk_size` per instrument. Finished chunks are recorded in a
+    checkpoint file, so an interrupted download is resumed by calling :meth:`download` again with the same
+    arguments::
+
+        downloader = HistoryDownloader("history/", data_class=M1, authorization_token=my_token)
+        downloader.download(["US88160R1014", "DE0007100000"], date_from=datetime.datetime(2021, 1, 1),
+                            date_until=datetime.datetime(2021, 4, 1))
+        candles = downloader.load("US88160R1014")  # dict of numpy arrays, ordered by date
+
+    :param directory: the directory the files are written to
+    :param data_class: :class:`lemon_markets.data.ohlc.M1` or :class:`lemon_markets.data.ohlc.Trades`
+    :param chunk_size: the time range fetched per request
+    :param max_workers: maximum number of chunks downloaded at the same time
+    :param limit: page size used while fetching a chunk, the API default if not set
+    """
+    checkpoint_name = "checkpoint.json"
+
+    def __init__(self, directory: str, data_class=M1, chunk_size: datetime.timedelta = datetime.timedelta(days=1),
+                 max_workers: int = DEFAULT_BATCH_MAX_WORKERS, authorization_token: Union[str, "Token"] = None,
+                 limit: int = None):
+        self.directory = directory
+        self.data_class = data_class
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.authorization_token = authorization_token
+        self.limit = limit
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._completed = self._read_checkpoint()
+
+    @property
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.directory, self.checkpoint_name)
+
+    def _read_checkpoint(self) -> set:
+        try:
+            with open(self._checkpoint_path) as checkpoint:
+                return set(json.load(checkpoint).get(self.data_class.__name__, []))
+        except (OSError, ValueError):
+            return set()
+
+    def _write_checkpoint(self):
+        # called with the lock held. Written to a temporary file first, so an interruption cannot corrupt it
+        try:
+            with open(self._checkpoint_path) as checkpoint:
+                content = json.load(checkpoint)
+        except (OSError, ValueError):
+            content = {}
+        content[self.data_class.__name__] = sorted(self._completed)
+        temporary_path = self._checkpoint_path + ".tmp"
+        with open(temporary_path, "w") as checkpoint:
+            json.dump(content, checkpoint)
+        os.replace(temporary_path, self._checkpoint_path)
+
+    def _path(self, chunk: HistoryChunk) -> str:
+        return os.path.join(self.directory, self.data_class.__name__.lower(), chunk.key + ".npz")
+
+    def chunks(self, instruments: Iterable[Union[str, "Instrument"]], date_from: datetime.datetime,
+               date_until: datetime.datetime) -> List[HistoryChunk]:
+        chunks = []
+        for instrument in instruments:
+            chunk_from = date_from
+            while chunk_from < date_until:
+                chunk_until = min(chunk_from + self.chunk_size, date_until)
+                chunks.append(HistoryChunk(str(instrument), chunk_from, chunk_until))
+                chunk_from = chunk_until
+        return chunks
+
+    def is_completed(self, chunk: HistoryChunk) -> bool:
+        return chunk.key in self._completed and os.path.exists(self._path(chunk))
+
+    def _download(self, chunk: HistoryChunk):
+        columnar.require_numpy()
+        columns = self.data_class.list(instrument=chunk.instrument,
+                                       ordering="date",
+                                       date_from=chunk.date_from,
+                                       date_until=chunk.date_until,
+                                       limit=self.limit,
+                                       authorization_token=self.authorization_token).to_numpy()
+        columns = columnar.drop_missing(columns, "date")  # rows without a date cannot be put in a chunk
+        # the range of a chunk excludes its end, which is the start of the next chunk
+        in_range = columns["date"] < int(chunk.date_until.timestamp() * 1000)
+        columns = {key: column[in_range] for key, column in columns.items()}
+
+        path = self._path(chunk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = path[:-len(".npz")] + ".tmp.npz"
+        columnar.numpy.savez_compressed(temporary_path, **columns)
+        os.replace(temporary_path, path)
+        with self._lock:
+            self._completed.add(chunk.key)
+            self._write_checkpoint()
+
+    def download(self, instruments: Iterable[Union[str, "Instrument"]], date_from: datetime.datetime,
+                 date_until: datetime.datetime) -> Dict[str, object]:
+        """
+        Download all chunks of `instruments` between `date_from` and `date_until` which have not been downloaded
+        before. A failing chunk does not stop the others, call :meth:`download` again to retry it.
+
+        :return: the number of chunks `downloaded` and `skipped` (already downloaded before) and the errors of the
+            `failed` chunks by chunk key
+        """
+        pending = []
+        skipped = 0
+        for chunk in self.chunks(instruments, date_from, date_until):
+            if self.is_completed(chunk):
+                skipped += 1
+            else:
+                pending.append(chunk)
+
+        results = BatchExecutor(max_workers=self.max_workers).run(_ChunkDownload(self, chunk) for chunk in pending)
+        failed = {chunk.key: result.error for chunk, result in zip(pending, results) if not result.successful}
+        return {"downloaded": len(pending) - len(failed), "skipped": skipped, "failed": failed}
+
+    def load(self, instrument: Union[str, "Instrument"]) -> Dict[str, "numpy.ndarray"]:
+        """
+        Read all downloaded chunks of `instrument` into one array per column, ordered by date.
+        """
+        columnar.require_numpy()
+        numpy = columnar.numpy
+        directory = os.path.join(self.directory, self.data_class.__name__.lower(), str(instrument))
+        parts = []
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".npz") and not name.endswith(".tmp.npz"):
+                    with numpy.load(os.path.join(directory, name)) as part:
+                        parts.append({key: part[key] for key in part.files})
+        columns = [key for key, _ in columnar.columns_of(self.data_class)]
+        if not parts:
+            return columnar.to_numpy(self.data_class, [])
+        merged = {key: numpy.concatenate([part[key] for part in parts]) for key in columns}
+        order = numpy.argsort(merged["date"], kind="stable")
+        return {key: column[order] for key, column in merged.items()}
@@ -0,0 +1,408 @@
+"""
+Technical indicators which are updated incrementally, in constant time and memory per value, so they can be fed
+directly from stream callbacks. Stream callbacks are called in the process of the stream, so the indicators updated
+there are that process' copies: use their values in the callback::
+
+    ema = PerInstrument(lambda: EMA(20))
+
+    def on_tick(tick):
+        if tick.price > ema.update_tick(tick):
+            ...
+
+    stream = TickStream(callback=on_tick)
+
+To keep the indicators in this process, stream into a buffer and update them from the records read::
+
+    stream = TickStream(buffer_size=65536)
+    ...
+    for record in stream.read(timeout=1):
+        ema[record["isin"].decode()].update(record["price"])
+    ema["US88160R1014"].value
+
+Before streaming, an indicator can be warmed up from stored data with :meth:`Indicator.warm_up`, which processes whole
+arrays at once (numpy is required for that, ``pip install lemon_markets[numpy]``) and leaves the indicator in the same
+state as updating it value by value would::
+
+    rsi = RSI(14)
+    rsi.warm_up(CandleStore().read("US88160R1014")["close"])
+    rsi.update(tick.price)
+"""
+import collections
+import math
+from typing import Callable, Dict, Iterator, Optional
+
+from lemon_markets.common import columnar
+
+
+def _ema_series(values: "numpy.ndarray", alpha: float, initial: float = None) -> "numpy.ndarray":
+    # y[k] = alpha * x[k] + (1 - alpha) * y[k - 1], starting at `initial` (or the first value). Evaluated in closed form
+    # per block, the block size keeps (1 - alpha) ** -block within the float64 range
+    numpy = columnar.numpy
+    result = numpy.empty(len(values), dtype=float)
+    if not len(values):
+        return result
+    decay = 1.0 - alpha
+    if decay <= 0:
+        result[:] = values
+        return result
+    previous = values[0] if initial is None else initial
+    block = max(1, int(-250 / math.log10(decay)))
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** numpy.arange(len(chunk))
+        result[start:start + len(chunk)] = powers * (decay * previous + alpha * numpy.cumsum(chunk / powers))
+        previous = result[start + len(chunk) - 1]
+    return result
+
+
+def _as_array(values) -> "numpy.ndarray":
+    columnar.require_numpy()
+    return columnar.numpy.asarray(values, dtype=float)
+
+
+class Indicator:
+    """
+    Base class of all indicators. `value` is the current value of the indicator, None as long as it has not seen enough
+    data.
+    """
+    value: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update_tick(self, tick: "Tick") -> Optional[float]:
+        raise NotImplementedError()
+
+    def update_quote(self, quote: "Quote") -> Optional[float]:
+        raise NotImplementedError()
+
+    def warm_up(self, *args) -> "numpy.ndarray":
+        """
+        Update the indicator with whole arrays of values and return the value after every update (NaN where it was not
+        available).
+        """
+        raise NotImplementedError()
+
+
+class PriceIndicator(Indicator):
+    """
+    Base class of indicators of a single price series. Ticks are fed with their price, quotes with their mid price.
+    """
+
+    def update(self, price: float) -> Optional[float]:
+        raise NotImplementedError()
+
+    def update_tick(self, tick: "Tick") -> Optional[float]:
+        if tick.price is None:
+            return self.value
+        return self.update(tick.price)
+
+    def update_quote(self, quote: "Quote") -> Optional[float]:
+        if quote.bid_price is None or quote.ask_price is None:
+            return self.value
+        return self.update((quote.bid_price + quote.ask_price) / 2)
+
+
+class EMA(PriceIndicator):
+    """
+    Exponential moving average with the smoothing factor ``2 / (period + 1)``, starting at the first price.
+
+    :param period: the number of prices after which the average is considered `ready`
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.count = 0
+        self.value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def update(self, price: float) -> float:
+        self.value = price if self.value is None else self.value + self.alpha * (price - self.value)
+        self.count += 1
+        return self.value
+
+    def warm_up(self, prices) -> "numpy.ndarray":
+        prices = _as_array(prices)
+        series = _ema_series(prices, self.alpha, self.value)
+        if len(series):
+            self.value = float(series[-1])
+            self.count += len(series)
+        return series
+
+
+class RollingStatistics(PriceIndicator):
+    """
+    Mean (`value`) and sample standard deviation (`std`) of the last `window` values, updated with Welford's method
+    instead of summing up the window again.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = collections.deque(maxlen=window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.value = None
+        self.std: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        values = self._values
+        if len(values) == self.window:
+            removed = values[0]
+            values.append(price)
+            mean = self._mean + (price - removed) / self.window
+            self._m2 += (price - removed) * (price - mean + removed - self._mean)
+            self._mean = mean
+        else:
+            values.append(price)
+            delta = price - self._mean
+            self._mean += delta / len(values)
+            self._m2 += delta * (price - self._mean)
+        if len(values) == self.window:
+            self.value = self._mean
+            self.std = math.sqrt(max(self._m2, 0.0) / (self.window - 1)) if self.window > 1 else 0.0
+        return self.value
+
+    def _rolling(self, values: "numpy.ndarray") -> tuple:
+        # rolling mean and standard deviation of `values` preceded by the current window, NaN until the window is full
+        numpy = columnar.numpy
+        combined = numpy.concatenate((numpy.asarray(self._values, dtype=float), values))
+        means = numpy.full(len(combined), numpy.nan)
+        stds = numpy.full(len(combined), numpy.nan)
+        if len(combined) >= self.window:
+            centered = combined - combined.mean()
+            sums = numpy.concatenate(([0.0], numpy.cumsum(centered)))
+            squares = numpy.concatenate(([0.0], numpy.cumsum(centered * centered)))
+            window_sums = sums[self.window:] - sums[:-self.window]
+            window_squares = squares[self.window:] - squares[:-self.window]
+            means[self.window - 1:] = window_sums / self.window + combined.mean()
+            if self.window > 1:
+                variances = (window_squares - window_sums * window_sums / self.window) / (self.window - 1)
+                stds[self.window - 1:] = numpy.sqrt(numpy.maximum(variances, 0.0))
+            else:
+                stds[self.window - 1:] = 0.0
+
+        skipped = len(self._values)
+        self._values.extend(float(value) for value in values[-self.window:])
+        # restore the running state exactly from the (at most `window`) values kept
+        window = numpy.asarray(self._values, dtype=float)
+        self._mean = float(window.mean()) if len(window) else 0.0
+        self._m2 = float(((window - self._mean) ** 2).sum())
+        if len(window) == self.window:
+            self.value = self._mean
+            self.std = math.sqrt(self._m2 / (self.window - 1)) if self.window > 1 else 0.0
+        return means[skipped:], stds[skipped:]
+
+    def warm_up(self, prices) -> "numpy.ndarray":
+        means, _ = self._rolling(_as_array(prices))
+        return means
+
+
+class RollingVolatility(PriceIndicator):
+    """
+    Standard deviation of the logarithmic returns of the last `window` prices.
+
+    :param scale: factor the standard deviation is multiplied with, e.g. ``math.sqrt(252 * 8.5 * 60)`` to annualize
+        the volatility of minute prices
+    """
+
+    def __init__(self, window: int, scale: float = 1.0):
+        self.scale = scale
+        self._returns = RollingStatistics(window)
+        self._last: Optional[float] = None
+        self.value = None
+
+    def update(self, price: float) -> Optional[float]:
+        if self._last is not None and self._last > 0 and price > 0:
+            self._returns.update(math.log(price / self._last))
+            if self._returns.std is not None:
+                self.value = self._returns.std * self.scale
+        self._last = price
+        return self.value
+
+    def warm_up(self, prices) -> "numpy.ndarray":
+        numpy = columnar.numpy
+        prices = _as_array(prices)
+        if not len(prices):
+            return prices
+        previous = numpy.concatenate(([numpy.nan if self._last is None else self._last], prices[:-1]))
+        valid = (previous > 0) & (prices > 0)
+        series = numpy.full(len(prices), numpy.nan)
+        _, stds = self._returns._rolling(numpy.log(prices[valid] / previous[valid]))
+        series[valid] = stds * self.scale
+        self._last = float(prices[-1])
+        if self._returns.std is not None:
+            self.value = self._returns.std * self.scale
+        return series
+
+
+class RSI(PriceIndicator):
+    """
+    Relative strength index with Wilder's smoothing of the average gain and loss over `period` price changes.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0
+        self._last: Optional[float] = None
+        self._gain: Optional[float] = None
+        self._loss: Optional[float] = None
+        self.value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    @staticmethod
+    def _index(gain, loss):
+        if loss == 0:
+            return 50.0 if gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def update(self, price: float) -> Optional[float]:
+        if self._last is not None:
+            change = price - self._last
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            if self._gain is None:
+                self._gain, self._loss = gain, loss
+            else:
+                self._gain += (gain - self._gain) / self.period
+                self._loss += (loss - self._loss) / self.period
+            self.count += 1
+            self.value = self._index(self._gain, self._loss)
+        self._last = price
+        return self.value
+
+    def warm_up(self, prices) -> "numpy.ndarray":
+        numpy = columnar.numpy
+        prices = _as_array(prices)
+        if not len(prices):
+            return prices
+        previous = numpy.concatenate(([numpy.nan if self._last is None else self._last], prices[:-1]))
+        changes = (prices - previous)[1 if self._last is None else 0:]
+        gains = _ema_series(numpy.maximum(changes, 0.0), 1.0 / self.period, self._gain)
+        losses = _ema_series(numpy.maximum(-changes, 0.0), 1.0 / self.period, self._loss)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            indices = numpy.where(losses == 0, numpy.where(gains == 0, 50.0, 100.0),
+                                  100.0 - 100.0 / (1.0 + gains / losses))
+        series = numpy.full(len(prices), numpy.nan)
+        series[len(prices) - len(indices):] = indices
+        if len(indices):
+            self._gain, self._loss = float(gains[-1]), float(losses[-1])
+            self.value = float(indices[-1])
+            self.count += len(indices)
+        self._last = float(prices[-1])
+        return series
+
+
+class VWAP(Indicator):
+    """
+    Volume weighted average price since the indicator was created or :meth:`reset`. Ticks without a quantity (streamed
+    without the ``with-quantity`` specifier) are skipped.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.volume = 0.0
+        self._turnover = 0.0
+        self.value = None
+
+    def update(self, price: float, quantity: float) -> Optional[float]:
+        if quantity:
+            self._turnover += price * quantity
+            self.volume += quantity
+            self.value = self._turnover / self.volume
+        return self.value
+
+    def update_tick(self, tick: "Tick") -> Optional[float]:
+        if tick.price is None or not tick.quantity:
+            return self.value
+        return self.update(tick.price, tick.quantity)
+
+    def warm_up(self, prices, quantities) -> "numpy.ndarray":
+        numpy = columnar.numpy
+        prices, quantities = _as_array(prices), _as_array(quantities)
+        turnover = self._turnover + numpy.cumsum(prices * quantities)
+        volume = self.volume + numpy.cumsum(quantities)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            series = numpy.where(volume > 0, turnover / volume, numpy.nan)
+        if len(series):
+            self._turnover, self.volume = float(turnover[-1]), float(volume[-1])
+            if self.volume > 0:
+                self.value = self._turnover / self.volume
+        return series
+
+
+class SpreadStatistics(Indicator):
+    """
+    The current bid-ask `spread` of quotes, and the mean (`value`) and standard deviation (`std`) of the spread over
+    the last `window` quotes.
+    """
+
+    def __init__(self, window: int):
+        self._statistics = RollingStatistics(window)
+        self.spread: Optional[float] = None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._statistics.value
+
+    @property
+    def std(self) -> Optional[float]:
+        return self._statistics.std
+
+    def update(self, bid_price: float, ask_price: float) -> Optional[float]:
+        self.spread = ask_price - bid_price
+        return self._statistics.update(self.spread)
+
+    def update_quote(self, quote: "Quote") -> Optional[float]:
+        if quote.bid_price is None or quote.ask_price is None:
+            return self.value
+        return self.update(quote.bid_price, quote.ask_price)
+
+    def warm_up(self, bid_prices, ask_prices) -> "numpy.ndarray":
+        spreads = _as_array(ask_prices) - _as_array(bid_prices)
+        if len(spreads):
+            self.spread = float(spreads[-1])
+        return self._statistics.warm_up(spreads)
+
+
+class PerInstrument:
+    """
+    One indicator per instrument, created by `factory` for the first tick or quote of an instrument. Pass
+    :meth:`update_tick` or :meth:`update_quote` as callback of a stream, or call them from one.
+
+    Note:
+        Stream callbacks are called in the process of the stream, the indicators in this process are not updated.
+    """
+
+    def __init__(self, factory: Callable[[], Indicator]):
+        self._factory = factory
+        self._indicators: Dict[str, Indicator] = {}
+
+    def __getitem__(self, isin: str) -> Indicator:
+        indicator = self._indicators.get(isin)
+        if indicator is None:
+            indicator = self._indicators[isin] = self._factory()
+        return indicator
+
+    def __contains__(self, isin: str) -> bool:
+        return isin in self._indicators
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._indicators)
+
+    def __len__(self) -> int:
+        return len(self._indicators)
+
+    def update_tick(self, tick: "Tick") -> Optional[float]:
+        return self[tick.isin].update_tick(tick)
+
+    def update_quote(self, quote: "Quote") -> Optional[float]:
+        return self[quote.isin].update_quote(quote)
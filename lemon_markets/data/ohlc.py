@@ -1,44 +1,122 @@
+import asyncio
 import datetime
-from typing import Union
+from typing import Dict, Iterable, Optional, Union
 
-from lemon_markets.common.objects import AbstractApiObject, ListMixin
+from lemon_markets.common.async_requests import AsyncApiRequest
+from lemon_markets.common.batch import BatchExecutor, BatchResult, PreparedRequest
+from lemon_markets.common.objects import UTC, AbstractApiRecord, ListMixin
 from lemon_markets.common.requests import ApiRequest
+from lemon_markets.settings import DEFAULT_BATCH_MAX_WORKERS
 
 
-class OHLCObject(AbstractApiObject):
-    class Fields(AbstractApiObject.Fields):
+class OHLCObject(AbstractApiRecord):
+    """
+    A candle. Stored without a per-object ``__dict__`` and with its date as the timestamp received (seconds since the
+    epoch), `date` builds the datetime only when it is accessed. One candle takes about 104 bytes (168 bytes as
+    dict-backed object holding a datetime, measured with benchmarks/bench_records.py on CPython 3.11).
+    """
+    __slots__ = ("open", "high", "low", "close", "timestamp")
+
+    class Fields(AbstractApiRecord.Fields):
         open: float
         high: float
         low: float
         close: float
         date: datetime.datetime
 
+    @property
+    def date(self) -> Optional[datetime.datetime]:
+        timestamp = self.timestamp
+        if timestamp and type(timestamp) in (int, float):
+            return datetime.datetime.fromtimestamp(timestamp, tz=UTC)
+        return timestamp or None
+
+    @date.setter
+    def date(self, value: Union[float, datetime.datetime, None]):
+        self.timestamp = value.timestamp() if isinstance(value, datetime.datetime) else value
+
+
+class TradeObject(AbstractApiRecord):
+    """
+    A trade. Stored without a per-object ``__dict__`` and with its date as the timestamp received (seconds since the
+    epoch), `date` builds the datetime only when it is accessed. One trade takes about 80 bytes (144 bytes as
+    dict-backed object holding a datetime, measured with benchmarks/bench_records.py on CPython 3.11).
+    """
+    __slots__ = ("timestamp", "price")
 
-class TradeObject(AbstractApiObject):
-    class Fields(AbstractApiObject.Fields):
+    class Fields(AbstractApiRecord.Fields):
         date: datetime.datetime
         price: float
 
+    date = OHLCObject.date
+
 
 class AbstractDataMixin(ListMixin):
+    __slots__ = ()
 
     @classmethod
     def _build_endpoint(cls, instrument: Union[str, "Instrument"]) -> str:
         raise NotImplementedError()
 
     def latest(self, instrument: Union[str, "Instrument"], authorization_token: Union[str, "Token"] = None):
-        request = ApiRequest(
-            endpoint=self._build_endpoint(instrument=instrument) + "latest/",
-            method="GET",
-            authorization_token=authorization_token
-        )
+        request = ApiRequest(**self._latest_request_arguments(instrument=instrument,
+                                                              authorization_token=authorization_token))
+
+        self.set_data(request.response)
+        return self
+
+    async def latest_async(self, instrument: Union[str, "Instrument"], authorization_token: Union[str, "Token"] = None):
+        request = await AsyncApiRequest(**self._latest_request_arguments(instrument=instrument,
+                                                                         authorization_token=authorization_token)
+                                        ).perform()
 
         self.set_data(request.response)
         return self
 
+    def prepare_latest(self, instrument: Union[str, "Instrument"],
+                       authorization_token: Union[str, "Token"] = None) -> PreparedRequest:
+        request = ApiRequest(**self._latest_request_arguments(instrument=instrument,
+                                                              authorization_token=authorization_token),
+                             defer=True)
+        return PreparedRequest(request=request, build=lambda executed: self.set_data(executed.response))
+
+    @classmethod
+    def latest_many(cls, instruments: Iterable[Union[str, "Instrument"]], authorization_token: Union[str, "Token"] = None,
+                    max_workers: int = DEFAULT_BATCH_MAX_WORKERS) -> Dict[str, BatchResult]:
+        """
+        Fetch the latest data of several instruments concurrently.
+
+        :return: the result (the latest object or the error) by ISIN, in the order of `instruments`
+        """
+        isins = list(dict.fromkeys(str(instrument) for instrument in instruments))
+        results = BatchExecutor(max_workers=max_workers).run(
+            cls().prepare_latest(instrument=isin, authorization_token=authorization_token) for isin in isins)
+        return dict(zip(isins, results))
+
+    @classmethod
+    async def latest_many_async(cls, instruments: Iterable[Union[str, "Instrument"]],
+                                authorization_token: Union[str, "Token"] = None) -> Dict[str, BatchResult]:
+        isins = list(dict.fromkeys(str(instrument) for instrument in instruments))
+        latest = await asyncio.gather(*(cls().latest_async(instrument=isin, authorization_token=authorization_token)
+                                        for isin in isins), return_exceptions=True)
+        return {isin: BatchResult(error=value) if isinstance(value, Exception) else BatchResult(value=value)
+                for isin, value in zip(isins, latest)}
+
+    @classmethod
+    def _latest_request_arguments(cls, instrument: Union[str, "Instrument"],
+                                  authorization_token: Union[str, "Token"] = None) -> dict:
+        return {
+            "endpoint": cls._build_endpoint(instrument=instrument) + "latest/",
+            "method": "GET",
+            "authorization_token": authorization_token
+        }
+
     def retrieve(self, instrument: Union[str, "Instrument"], authorization_token: Union[str, "Token"] = None):
         return self.latest(instrument=instrument, authorization_token=authorization_token)
 
+    async def retrieve_async(self, instrument: Union[str, "Instrument"], authorization_token: Union[str, "Token"] = None):
+        return await self.latest_async(instrument=instrument, authorization_token=authorization_token)
+
     @classmethod
     def list(
              cls,
@@ -59,8 +137,29 @@ class AbstractDataMixin(ListMixin):
                               list_endpoint=cls._build_endpoint(instrument=instrument),
                               object_class=cls)
 
+    @classmethod
+    async def list_async(
+             cls,
+             instrument: Union[str, "Instrument"],
+             ordering: str = "-date",
+             date_from: Union[str, datetime.datetime] = None,
+             date_until: Union[str, datetime.datetime] = None,
+             limit: int = None,
+             offset: int = None,
+             authorization_token: Union[str, "Token"] = None,
+             ):
+        return await ListMixin.list_async(ordering=ordering,
+                                          date_from=date_from,
+                                          date_until=date_until,
+                                          limit=limit,
+                                          offset=offset,
+                                          authorization_token=authorization_token,
+                                          list_endpoint=cls._build_endpoint(instrument=instrument),
+                                          object_class=cls)
+
 
 class M1(OHLCObject, AbstractDataMixin):
+    __slots__ = ()
 
     @classmethod
     def _build_endpoint(cls, instrument: Union[str, "Instrument"]) -> str:
@@ -69,6 +168,7 @@ class M1(OHLCObject, AbstractDataMixin):
 
 
 class Trades(TradeObject, AbstractDataMixin):
+    __slots__ = ()
 
     @classmethod
     def _build_endpoint(cls, instrument: Union[str, "Instrument"]) -> str:
@@ -80,4 +180,4 @@ class Ticks(Trades):
     """
     Ticks and trades are the same. Just added this class in order to give you guys both possibilities:)
     """
-    pass
+    __slots__ = ()
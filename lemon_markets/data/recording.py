@@ -0,0 +1,227 @@
+import datetime
+import gzip
+import heapq
+import os
+import re
+import time
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from lemon_markets.common.errors import StreamError
+from lemon_markets.common.objects import UTC
+
+# the maximum seconds a frame waits to be written, frames not written yet are lost if the process is killed. Frames are
+# compressed in batches, compressing every frame on its own costs several times more
+FLUSH_INTERVAL = 1.0
+
+# how a segment ends which was cut short, e.g. because the recording process was killed while writing it
+_TRUNCATED = (EOFError, zlib.error, getattr(gzip, "BadGzipFile", OSError))
+
+
+def _day(timestamp: float) -> datetime.date:
+    return datetime.datetime.fromtimestamp(timestamp, tz=UTC).date()
+
+
+class StreamRecorder:
+    """
+    Writes the raw frames received by a stream, with the time they were received, to gzip compressed logs per UTC day.
+    Every line is the receive timestamp and the frame, separated by a tab.
+
+    Every start of a recording, and every new day, writes a segment file of its own
+    (`directory`/`name`-YYYY-MM-DD.N.log.gz, N counting up from 0), so a recording restarted after it was killed never
+    appends to a file which was cut short. The file is opened on the first frame, so a recorder can be passed to the
+    stream process before.
+
+    Frames are written at least every :data:`FLUSH_INTERVAL` seconds: by :meth:`record` while frames arrive, and by
+    :meth:`flush_due`, which the stream process calls while it waits, once they stop.
+
+    :param directory: the directory of the logs, created if it does not exist
+    :param name: the first part of the file names, e.g. the type of the stream
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self._file = None
+        # the timestamps [start, end) of the day of the open file
+        self._day_start = self._day_end = 0.0
+        self._lines: List[str] = []
+        self._flushed = 0.0
+
+    def path(self, day: datetime.date, segment: int = 0) -> str:
+        return os.path.join(self.directory, "{}-{}.{}.log.gz".format(self.name, day.isoformat(), segment))
+
+    def segments(self) -> List[Tuple[datetime.date, int]]:
+        """
+        The (day, segment) of every log written to the directory, in order.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        pattern = re.compile(r"{}-(\d{{4}}-\d{{2}}-\d{{2}})\.(\d+)\.log\.gz$".format(re.escape(self.name)))
+        matches = filter(None, (pattern.match(name) for name in os.listdir(self.directory)))
+        return sorted((datetime.datetime.strptime(match.group(1), "%Y-%m-%d").date(), int(match.group(2)))
+                      for match in matches)
+
+    def __getstate__(self):
+        return {"directory": self.directory, "name": self.name}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["directory"], state["name"])
+
+    def _open(self, day: datetime.date):
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        segment = max((number for segment_day, number in self.segments() if segment_day == day), default=-1) + 1
+        while self._file is None:
+            try:
+                self._file = gzip.open(self.path(day, segment), "xb")
+            except FileExistsError:  # created by another recorder in the meantime
+                segment += 1
+        self._day_start = datetime.datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp()
+        self._day_end = self._day_start + 86400
+
+    def record(self, frame: str, received: float = None):
+        """
+        Append `frame`, received at `received` (seconds since the epoch, now by default).
+        """
+        if received is None:
+            received = time.time()
+        if not self._day_start <= received < self._day_end:
+            self._open(_day(received))
+        # a newline in a JSON frame can only be whitespace between tokens
+        self._lines.append("{:.6f}\t{}\n".format(received, frame.replace("\n", " ")))
+        if time.monotonic() - self._flushed >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush_due(self) -> Optional[float]:
+        """
+        Write the frames recorded since the last write if they waited for :data:`FLUSH_INTERVAL`.
+
+        :return: the seconds until the next write is due, None if there is nothing left to write
+        """
+        if not self._lines:
+            return None
+        wait = self._flushed + FLUSH_INTERVAL - time.monotonic()
+        if wait > 0:
+            return wait
+        self.flush()
+        return None
+
+    def flush(self):
+        """
+        Compress and write the frames recorded since the last flush.
+        """
+        if self._lines:
+            self._file.write("".join(self._lines).encode())
+            self._file.flush()
+            self._lines = []
+        self._flushed = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+            self._day_start = self._day_end = 0.0
+
+
+class _AnySubscribed(dict):
+    # replays frames of every ISIN, without a specifier
+    def __missing__(self, key):
+        return None
+
+    def __contains__(self, key):
+        return True
+
+
+class StreamReplayer:
+    '''Replays the frames recorded by a stream (see the `record_to` parameter of
+    :class:`lemon_markets.data.streams.TickStream`) through the same serializer and callback as the live stream::
+
+        replayer = StreamReplayer("recordings/", TickStream)
+        replayer.replay(strategy.on_tick, speed=10)  # ten times faster than recorded
+        replayer.replay(strategy.on_tick, speed=None)  # as fast as possible
+
+    Args:
+        directory (str, required): The directory of the recordings
+        stream_class (type, required): :class:`lemon_markets.data.streams.TickStream` or
+            :class:`lemon_markets.data.streams.QuoteStream`, the stream the frames were recorded from
+
+    Note:
+        A segment which ends in an incomplete write (the recording process was killed) is replayed up to it, the
+        replay continues with the next segment. Segments of the same day are merged by receive time
+    '''
+
+    def __init__(self, directory: str, stream_class: type):
+        self.directory = directory
+        self._serializer = stream_class._serializer
+        self._recorder = StreamRecorder(directory, stream_class._type)
+
+    def days(self) -> List[datetime.date]:
+        """
+        The days for which there are recordings, in order.
+        """
+        return sorted({day for day, _ in self._recorder.segments()})
+
+    @staticmethod
+    def _read_segment(path: str, start: float, end: float) -> Iterator[Tuple[float, str]]:
+        with gzip.open(path, "rt") as file:
+            try:
+                for line in file:
+                    if not line.endswith("\n"):  # the last line of a segment cut short
+                        return
+                    received, _, frame = line[:-1].partition("\t")
+                    received = float(received)
+                    if start <= received < end:
+                        yield received, frame
+            except _TRUNCATED:
+                return
+
+    def frames(self, date_from: datetime.datetime = None, date_until: datetime.datetime = None) -> Iterator[Tuple[float, str]]:
+        """
+        The recorded (receive timestamp, frame) pairs received in [`date_from`, `date_until`), in order.
+        """
+        start = date_from.timestamp() if date_from is not None else float("-inf")
+        end = date_until.timestamp() if date_until is not None else float("inf")
+        segments: Dict[datetime.date, List[int]] = {}
+        for day, segment in self._recorder.segments():
+            if (date_from is None or day >= _day(start)) and (date_until is None or day <= _day(end)):
+                segments.setdefault(day, []).append(segment)
+        for day, numbers in sorted(segments.items()):
+            yield from heapq.merge(*(self._read_segment(self._recorder.path(day, number), start, end)
+                                     for number in numbers), key=lambda pair: pair[0])
+
+    def replay(self, callback: Callable, speed: Optional[float] = 1, subscribed: Dict[str, str] = None,
+               date_from: datetime.datetime = None, date_until: datetime.datetime = None) -> int:
+        """
+        Pass the recorded frames, deserialized like by the live stream, to `callback`.
+
+        :param callback: the function to call with every :class:`lemon_markets.data.streams.Tick` or
+            :class:`lemon_markets.data.streams.Quote`
+        :param speed: how many times faster than recorded the frames are replayed, None to replay them as fast as
+            possible
+        :param subscribed: the ISINs to replay and their specifiers, by default all ISINs without a specifier
+        :param date_from: the first receive time to replay
+        :param date_until: the receive time to stop the replay at (exclusive)
+        :return: the number of messages passed to `callback`
+        """
+        if subscribed is None:
+            subscribed = _AnySubscribed()
+        count = 0
+        first = started = None
+        for received, frame in self.frames(date_from=date_from, date_until=date_until):
+            if speed:
+                if first is None:
+                    first, started = received, time.monotonic()
+                delay = (received - first) / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                serialized = self._serializer(frame, subscribed)
+            except KeyError:  # an ISIN which is not replayed
+                continue
+            except StreamError:  # an error message of the API, e.g. about a subscription
+                continue
+            callback(serialized)
+            count += 1
+        return count
@@ -0,0 +1,184 @@
+import datetime
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Union
+
+from lemon_markets.common import columnar
+from lemon_markets.common.batch import BatchExecutor, BatchResult
+from lemon_markets.common.objects import UTC
+from lemon_markets.data.ohlc import M1
+from lemon_markets.settings import DEFAULT_BATCH_MAX_WORKERS, DEFAULT_STORE_PATH
+
+RECORD_TYPES = {
+    columnar.FLOAT: "<f8",
+    columnar.INT: "<i8",
+    columnar.BOOL: "?",
+    columnar.TIMESTAMP: "<i8",
+}
+
+
+def record_dtype(data_class) -> "numpy.dtype":
+    """
+    The fixed size record type `data_class` is stored as. Fields which have no fixed size (strings) are not stored.
+    """
+    columnar.require_numpy()
+    return columnar.numpy.dtype([(key, RECORD_TYPES[column_type]) for key, column_type in columnar.columns_of(data_class)
+                                 if column_type in RECORD_TYPES])
+
+
+def _milliseconds(date: datetime.datetime) -> int:
+    return int(date.timestamp() * 1000)
+
+
+class _StoreSync:
+    # a sync of one instrument as job of the BatchExecutor
+    def __init__(self, store: "CandleStore", instrument: str, data_class, date_from: datetime.datetime,
+                 date_until: datetime.datetime):
+        self.store = store
+        self.instrument = instrument
+        self.data_class = data_class
+        self.date_from = date_from
+        self.date_until = date_until
+
+    def execute(self) -> int:
+        return self.store.sync(self.instrument, data_class=self.data_class, date_from=self.date_from,
+                               date_until=self.date_until)
+
+
+class CandleStore:
+    """
+    A local store of candles (:class:`lemon_markets.data.ohlc.M1`) or trades (:class:`lemon_markets.data.ohlc.Trades`)
+    per instrument, for backtests and warm-ups without calling the API::
+
+        store = CandleStore("candles/", authorization_token=my_token)
+        store.sync("US88160R1014", date_from=datetime.datetime(2021, 1, 1))  # initial download
+        store.sync("US88160R1014")  # later: only fetches what is newer than the stored data
+
+        candles = store.read("US88160R1014", date_from=datetime.datetime(2021, 3, 1))
+        candles["close"].mean()
+
+    Every instrument and resolution is one file of fixed size little-endian records (see :func:`record_dtype`)
+    ordered by date, with dates as milliseconds since the epoch. :meth:`read` memory-maps the file instead of parsing
+    it, so opening even years of minute bars is instant and only the pages actually accessed are read from disk.
+
+    numpy is required (``pip install lemon_markets[numpy]``).
+
+    :param directory: the directory the files are stored in
+    :param authorization_token: the token used to sync the store
+    :param max_workers: maximum number of instruments synced at the same time by :meth:`sync_many`
+    :param limit: page size used while syncing, the API default if not set
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE_PATH, authorization_token: Union[str, "Token"] = None,
+                 max_workers: int = DEFAULT_BATCH_MAX_WORKERS, limit: int = None):
+        columnar.require_numpy()
+        self.directory = directory
+        self.authorization_token = authorization_token
+        self.max_workers = max_workers
+        self.limit = limit
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _path(self, instrument: Union[str, "Instrument"], data_class) -> str:
+        return os.path.join(self.directory, data_class.__name__.lower(), str(instrument) + ".bin")
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _map(self, path: str, dtype: "numpy.dtype") -> "numpy.ndarray":
+        # a trailing partial record (left by an interrupted append) is ignored
+        count = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return columnar.numpy.empty(0, dtype=dtype)
+        return columnar.numpy.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def instruments(self, data_class=M1) -> List[str]:
+        """
+        The instruments stored in the resolution of `data_class`.
+        """
+        directory = os.path.join(self.directory, data_class.__name__.lower())
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".bin")] for name in os.listdir(directory) if name.endswith(".bin"))
+
+    def last_date(self, instrument: Union[str, "Instrument"], data_class=M1) -> Optional[datetime.datetime]:
+        """
+        The date of the newest stored record, None if nothing is stored yet.
+        """
+        records = self._map(self._path(instrument, data_class), record_dtype(data_class))
+        if not len(records):
+            return None
+        return datetime.datetime.fromtimestamp(int(records["date"][-1]) / 1000, tz=UTC)
+
+    def read(self, instrument: Union[str, "Instrument"], data_class=M1, date_from: datetime.datetime = None,
+             date_until: datetime.datetime = None) -> "numpy.ndarray":
+        """
+        The stored records of `instrument` in the range [`date_from`, `date_until`) as read-only, memory-mapped
+        structured array, e.g. ``records["close"]``. Dates are int64 milliseconds since the epoch.
+        """
+        records = self._map(self._path(instrument, data_class), record_dtype(data_class))
+        start, end = 0, len(records)
+        if date_from is not None:
+            start = int(records["date"].searchsorted(_milliseconds(date_from), side="left"))
+        if date_until is not None:
+            end = int(records["date"].searchsorted(_milliseconds(date_until), side="left"))
+        return records[start:max(start, end)]
+
+    def _append(self, path: str, dtype: "numpy.dtype", columns: Dict[str, "numpy.ndarray"],
+                after: Optional[int]) -> int:
+        numpy = columnar.numpy
+        columns = columnar.drop_missing(columns, "date")  # rows without a date cannot be ordered
+        records = numpy.empty(len(columns["date"]), dtype=dtype)
+        for key in dtype.names:
+            records[key] = columns[key]
+        records = records[numpy.argsort(records["date"], kind="stable")]
+        if after is not None:
+            records = records[records["date"] > after]
+        if not len(records):
+            return 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as file:
+            size = file.seek(0, os.SEEK_END)
+            if size % dtype.itemsize:
+                file.truncate(size - size % dtype.itemsize)
+            file.write(records.tobytes())
+        return len(records)
+
+    def sync(self, instrument: Union[str, "Instrument"], data_class=M1, date_from: datetime.datetime = None,
+             date_until: datetime.datetime = None) -> int:
+        """
+        Fetch and append the records of `instrument` which are newer than the newest stored one.
+
+        :param date_from: where to start if nothing is stored yet, ignored otherwise
+        :param date_until: fetch up to this date, now if not set
+        :return: the number of appended records
+        """
+        path = self._path(instrument, data_class)
+        dtype = record_dtype(data_class)
+        with self._lock(path):
+            stored = self._map(path, dtype)
+            last = int(stored["date"][-1]) if len(stored) else None
+            del stored  # release the mapping before the file is appended to
+            if last is not None:
+                date_from = datetime.datetime.fromtimestamp(last / 1000, tz=UTC)
+            columns = data_class.list(instrument=instrument,
+                                      ordering="date",
+                                      date_from=date_from,
+                                      date_until=date_until,
+                                      limit=self.limit,
+                                      authorization_token=self.authorization_token).to_numpy()
+            return self._append(path, dtype, columns, after=last)
+
+    def sync_many(self, instruments: Iterable[Union[str, "Instrument"]], data_class=M1,
+                  date_from: datetime.datetime = None, date_until: datetime.datetime = None) -> Dict[str, BatchResult]:
+        """
+        :meth:`sync` several instruments concurrently. A failing instrument does not stop the others.
+
+        :return: the result (number of appended records or error) by instrument
+        """
+        instruments = [str(instrument) for instrument in instruments]
+        results = BatchExecutor(max_workers=self.max_workers).run(
+            _StoreSync(self, instrument, data_class, date_from, date_until) for instrument in instruments)
+        return dict(zip(instruments, results))
@@ -1,36 +1,93 @@
 import datetime
 import json
 import multiprocessing
-from time import time
-from typing import Callable
+import multiprocessing.connection
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Union
 
-from websocket import create_connection
+from websocket import ABNF, create_connection
 
+from lemon_markets.common import columnar, encoding
 from lemon_markets.common.errors import StreamError
-from lemon_markets.settings import DEFAULT_STREAM_API_URL
+from lemon_markets.common.retry import get_retry_policy
+from lemon_markets.common.ringbuffer import RETRY_INTERVAL, RingBuffer
+from lemon_markets.data.gaps import GapTracker
+from lemon_markets.data.ohlc import Trades
+from lemon_markets.data.recording import StreamRecorder
+from lemon_markets.settings import DEFAULT_STREAM_API_URL, DEFAULT_STREAM_SHARDS
 
 
 class BaseSerializer:
-    json_content: dict = None
-
-    def __init__(self, message: str):
-        self.json_content = json.loads(message)
-        self.__check_for_error()
-
-    def __check_for_error(self):
-        if self.json_content.get("error"):
-            raise StreamError(detail=self.json_content.get("message"))
-
-        if not self.json_content:
+    """
+    Base class of the messages received from a stream. Subclasses declare their attributes in `__slots__`, so no
+    per-message ``__dict__`` (and no copy of the parsed message) is kept. The date of a message is stored as the
+    timestamp received, `date` builds the datetime only when it is accessed.
+    """
+    __slots__ = ()
+    # the attributes shown by to_representation
+    _fields: tuple = ()
+    # (column, key in the message, numpy dtype) of the columns returned by decode_batch
+    _columns: tuple = ()
+    # (attribute, numpy dtype) of the fixed size records written to a stream's buffer
+    _record_type: tuple = ()
+
+    def __init__(self, message: Union[str, bytes], subscribed: dict):
+        self._set_content(self._decode(message), subscribed)
+
+    @staticmethod
+    def _check(json_content: dict) -> dict:
+        if json_content.get("error"):
+            raise StreamError(detail=json_content.get("message"))
+
+        if not json_content:
             raise StreamError(detail="Unknown error")
+        return json_content
+
+    @staticmethod
+    def _decode(message: Union[str, bytes]) -> dict:
+        return BaseSerializer._check(encoding.loads(message))
+
+    def _set_content(self, json_content: dict, subscribed: dict):
+        raise NotImplementedError()
+
+    @property
+    def date(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.timestamp)
+
+    @date.setter
+    def date(self, value: datetime.datetime):
+        self.timestamp = value.timestamp()
+
+    @classmethod
+    def decode_batch(cls, messages: List[Union[str, bytes]], subscribed: dict) -> Dict[str, "numpy.ndarray"]:
+        """
+        Decode a burst of messages into one numpy array per attribute (``timestamp`` holding the dates as seconds
+        since the epoch), without creating an object per message. Messages of ISINs which are not in `subscribed` are
+        skipped.
+        """
+        columnar.require_numpy()
+        numpy = columnar.numpy
+        rows = [row for row in map(encoding.loads, messages) if row.get("isin") in subscribed or not cls._check(row)]
+        columns = {column: numpy.array([row.get(key) for row in rows], dtype=dtype)
+                   for column, key, dtype in cls._columns}
+        columns["specifier"] = numpy.array([subscribed[row["isin"]] for row in rows], dtype=object)
+        return columns
 
     def to_representation(self):
         output_dict: dict = {}
-        for key, value in self.__dict__.items():
-            if value and key != "json_content":
+        for key in self._fields:
+            value = getattr(self, key, None)
+            if value:
                 output_dict[key] = value
         return output_dict
 
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__ if hasattr(self, key)}
+
+    def __setstate__(self, state: dict):
+        for key, value in state.items():
+            setattr(self, key, value)
+
     def __repr__(self):
         output = self.to_representation()
         return str(self.__class__.__name__) \
@@ -46,21 +103,30 @@ class Quote(BaseSerializer):
         bid_price (float): The bid price
         ask_price (float): The ask price
         date (datetime.datetime): The datetime of the quote (will yield human-readable string if printed)
+        timestamp (float): The date of the quote as seconds since the epoch
         bid_quantity (int): The quantity of the bid
         ask_quantity (int): The quantity of the ask
         specifier (str): The mode in which the quote price is delivered. See :doc:`specifiers`
 
     Note:
-        The descriptions may be incomplete
+        The descriptions may be incomplete. A quote takes about 285 bytes including its values (990 bytes before
+        the parsed message was dropped, measured with benchmarks/bench_records.py on CPython 3.11)
     '''
-    def __init__(self, message, subscribed):
-        super().__init__(message)
-        self.isin = self.json_content.get("isin")
-        self.bid_price = self.json_content.get("bid_price")
-        self.ask_price = self.json_content.get("ask_price")
-        self.date = datetime.datetime.fromtimestamp(float(self.json_content.get("date")))
-        self.bid_quantity = self.json_content.get("bid_quan")
-        self.ask_quantity = self.json_content.get("ask_quan")
+    __slots__ = ("isin", "bid_price", "ask_price", "timestamp", "bid_quantity", "ask_quantity", "specifier")
+    _fields = ("isin", "bid_price", "ask_price", "date", "bid_quantity", "ask_quantity", "specifier")
+    _columns = (("isin", "isin", object), ("bid_price", "bid_price", float), ("ask_price", "ask_price", float),
+                ("timestamp", "date", float), ("bid_quantity", "bid_quan", float),
+                ("ask_quantity", "ask_quan", float))
+    _record_type = (("isin", "S12"), ("bid_price", "<f8"), ("ask_price", "<f8"), ("timestamp", "<f8"),
+                    ("bid_quantity", "<f8"), ("ask_quantity", "<f8"))
+
+    def _set_content(self, json_content: dict, subscribed: dict):
+        self.isin = json_content.get("isin")
+        self.bid_price = json_content.get("bid_price")
+        self.ask_price = json_content.get("ask_price")
+        self.timestamp = float(json_content.get("date"))
+        self.bid_quantity = json_content.get("bid_quan")
+        self.ask_quantity = json_content.get("ask_quan")
         self.specifier = subscribed[self.isin]
 
 
@@ -72,111 +138,462 @@ class Tick(BaseSerializer):
         quantity (int): The quantity
         price (float): The price at the time
         date (datetime.datetime): The datetime of the tick (will yield human-readable string if printed)
+        timestamp (float): The date of the tick as seconds since the epoch
         side (int): The side (buy or sell)
         specifier (str): The mode in which the tick price is delivered. See :doc:`specifiers`
 
     Note:
-        The descriptions may be incomplete
+        The descriptions may be incomplete. A tick takes about 225 bytes including its values (775 bytes before
+        the parsed message was dropped, measured with benchmarks/bench_records.py on CPython 3.11)
     '''
-    def __init__(self, message, subscribed):
-        super().__init__(message)
-        self.isin = self.json_content.get("isin")
-        self.price = self.json_content.get("price")
-        self.quantity = self.json_content.get("quantity")
-        self.date = datetime.datetime.fromtimestamp(float(self.json_content.get("date")))
-        self.side = self.json_content.get("side")
+    __slots__ = ("isin", "price", "quantity", "timestamp", "side", "specifier")
+    _fields = ("isin", "price", "quantity", "date", "side", "specifier")
+    _columns = (("isin", "isin", object), ("price", "price", float), ("quantity", "quantity", float),
+                ("timestamp", "date", float), ("side", "side", object))
+    _record_type = (("isin", "S12"), ("price", "<f8"), ("quantity", "<f8"), ("timestamp", "<f8"), ("side", "S4"))
+
+    def _set_content(self, json_content: dict, subscribed: dict):
+        self.isin = json_content.get("isin")
+        self.price = json_content.get("price")
+        self.quantity = json_content.get("quantity")
+        self.timestamp = float(json_content.get("date"))
+        self.side = json_content.get("side")
         self.specifier = subscribed[self.isin]
 
+    @classmethod
+    def from_trade(cls, isin: str, trade: "Trades", specifier: str = None) -> "Tick":
+        """
+        A tick built from a trade of the history (used to fill gaps of a stream), without quantity and side.
+        """
+        tick = cls.__new__(cls)
+        tick.isin = isin
+        tick.price = trade.price
+        tick.quantity = None
+        tick.timestamp = float(trade.timestamp)
+        tick.side = None
+        tick.specifier = specifier
+        return tick
+
+
+RATE_WINDOW = 5  # seconds, see StreamBase.message_rates
+# the wait between failed connects doubles up to this many times (bounded by the max_backoff of the retry policy)
+MAX_RECONNECT_DOUBLINGS = 16
+
+
+class Conflator:
+    """
+    Throttles messages per key (e.g. ISIN): a message is delivered right away if the last one of its key was delivered
+    at least `interval` seconds ago. Otherwise it replaces any message of its key waiting for delivery, so only the most
+    recent one is delivered once the interval has passed.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._delivered: Dict[Hashable, float] = {}
+        self._pending: Dict[Hashable, Any] = {}
+
+    def offer(self, key: Hashable, message: Any, now: float) -> Optional[Any]:
+        """
+        Return `message` if it can be delivered now, otherwise keep it pending and return None.
+        """
+        delivered = self._delivered.get(key)
+        if delivered is None or now - delivered >= self.interval:
+            self._delivered[key] = now
+            self._pending.pop(key, None)
+            return message
+        self._pending[key] = message
+        return None
+
+    def due(self, now: float) -> List[Any]:
+        """
+        Remove and return the pending messages whose interval has passed.
+        """
+        due = [key for key in self._pending if now - self._delivered[key] >= self.interval]
+        for key in due:
+            self._delivered[key] = now
+        return [self._pending.pop(key) for key in due]
+
+    def next_due(self, now: float) -> Optional[float]:
+        """
+        Seconds until the next pending message is due, None if no message is pending.
+        """
+        if not self._pending:
+            return None
+        return max(0.0, min(self._delivered[key] for key in self._pending) + self.interval - now)
 
-class WSWorker(multiprocessing.Process):
-    _last_message_time = 0
 
-    def __init__(self, keepalive, restart, subscribed, serializer,
-                 connect_url, typ3, callback, timeout, frequency_limit):
+class WSWorker(multiprocessing.Process):
+    """
+    The process receiving the messages of a stream. It waits for messages and for subscription changes sent by the
+    :class:`StreamBase` through the `control` pipe at the same time, so changes are applied on the open connection.
+    The connection is only renewed if no message was received for `timeout` seconds or it broke. After half the
+    `timeout` without messages a ping is sent: a connection which does not answer it counts as broken, as a dead
+    connection (e.g. a half-open TCP connection) shows no other sign, one which answers only had a quiet feed. If
+    connecting fails, it is retried with the backoff of the retry policy
+    (:func:`lemon_markets.common.retry.get_retry_policy`).
+
+    With a `batch_size`, all messages already waiting (up to `batch_size`) are decoded at once by the serializer's
+    `decode_batch` and passed to the callback as columns. With a `buffer`, the callback writes to it and records
+    conflated by the buffer are written as soon as there is space again. With a `recorder`, every frame received is
+    recorded before it is deserialized. The `gaps` tracker measures the time lost when the connection broke and returns
+    the messages missed meanwhile, which are passed on before any new message.
+    """
+
+    def __init__(self, control, serializer, connect_url, typ3, callback, timeout, frequency_limit, batch_size=0,
+                 buffer=None, recorder=None, gaps=None):
         super().__init__(target=self)
-        self._keepalive = keepalive
-        self._restart = restart
-        self._subscribed = subscribed
+        self._control = control
+        self._subscribed = {}
         self._serializer = serializer
         self._connect_url = connect_url
         self._type = typ3
         self._callback = callback
         self._timeout = timeout
         self._frequency_limit = frequency_limit
+        self._batch_size = batch_size
+        self._buffer = buffer
+        self._recorder = recorder
+        self._gaps = gaps if gaps is not None else GapTracker(serializer)
+        self._running = True
+        self._ponged = False
+        # messages received per ISIN in the current and the previous rate window
+        self._counts: Dict[str, int] = {}
+        self._counted_since = time.monotonic()
+        self._previous_counts: Dict[str, int] = {}
+        self._previous_elapsed = 0.0
 
     def run(self):
-        while self._keepalive.value:
-            self._restart.value = False
-            ws = create_connection(self._connect_url,
-                                   self._timeout)
-            for each in self._subscribed.keys():
-                ws.send(json.dumps({
-                                  "action": "subscribe",
-                                  "type": self._type,
-                                  "specifier": self._subscribed[each],
-                                  "value": each
-                              }))
-            while self._keepalive.value and not self._restart.value:
-                if not (time() - self._last_message_time > self._frequency_limit):
-                    continue
-                try:
-                    serialized = self._serializer(ws.recv(), self._subscribed)
-                except Exception:
-                    break
+        # whether the previous connection broke, messages were only missed then and not after a silent reconnect
+        failed = False
+        attempt = 0  # connects which failed in a row
+        while self._running:
+            ws = None
+            try:
+                ws = create_connection(self._connect_url,
+                                       self._timeout)
+                attempt = 0
+                self._send_subscriptions(ws, "subscribe", self._subscribed)
+                self._receive(ws, failed)
+                failed = False
+            except Exception:
+                failed = True  # reconnect
+            finally:
+                if ws is not None:
+                    ws.close()
+            if ws is None:  # the connect failed, e.g. the server is not reachable right now
+                self._wait_to_reconnect(get_retry_policy().backoff(min(attempt, MAX_RECONNECT_DOUBLINGS)))
+                attempt += 1
+        if self._recorder is not None:
+            self._recorder.close()
+
+    def _recv(self, ws) -> Optional[str]:
+        # the next message, None for a control frame. A pong, the answer to the ping sent by _receive, is noted
+        opcode, message = ws.recv_data(control_frame=True)
+        if opcode == ABNF.OPCODE_PONG:
+            self._ponged = True
+            return None
+        if opcode == ABNF.OPCODE_CLOSE:
+            raise StreamError(detail="The connection was closed by the server.")
+        if opcode not in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY):  # a ping, answered by the websocket client
+            return None
+        if opcode == ABNF.OPCODE_TEXT and isinstance(message, bytes):
+            message = message.decode("utf-8")
+        if self._recorder is not None:
+            self._recorder.record(message)
+        return message
+
+    def _wait_to_reconnect(self, delay: float):
+        # subscription changes arriving in the meantime are sent with all subscriptions once connected again
+        deadline = time.monotonic() + delay
+        while self._running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._control.poll(remaining):
+                return
+            self._handle_control(None)
+
+    def _send_subscriptions(self, ws, action: str, subscriptions: dict):
+        if ws is None:  # not connected, all subscriptions are sent once connected again
+            return
+        for isin, specifier in subscriptions.items():
+            message = {"action": action, "type": self._type, "value": isin}
+            if specifier is not None:
+                message["specifier"] = specifier
+            ws.send(json.dumps(message))
+
+    def _handle_control(self, ws):
+        # apply all pending subscription changes, only the ISINs which actually changed are sent
+        while self._running and self._control.poll():
+            try:
+                action, payload = self._control.recv()
+            except EOFError:  # the stream was garbage collected without closing
+                action, payload = "close", None
+            if action == "close":
+                self._running = False
+            elif action == "subscribe":
+                added = {isin: specifier for isin, specifier in payload.items() if isin not in self._subscribed}
+                self._subscribed.update(added)
+                self._send_subscriptions(ws, "subscribe", added)
+            elif action == "unsubscribe":
+                removed = {isin: None for isin in payload if self._subscribed.pop(isin, None) is not None}
+                self._send_subscriptions(ws, "unsubscribe", removed)
+                self._gaps.forget(removed)
+            elif action == "report":
+                self._report_rates(payload)
+            elif action == "gaps":
+                self._control.send(("gaps", (payload, self._gaps.metrics())))
+
+    def _report_rates(self, request_id: int):
+        # rates over the current and the previous window, so a report is never based on just a few messages
+        now = time.monotonic()
+        counted = now - self._counted_since
+        elapsed = max(counted + self._previous_elapsed, 1e-9)
+        rates = {isin: (self._counts.get(isin, 0) + self._previous_counts.get(isin, 0)) / elapsed
+                 for isin in self._subscribed}
+        if counted >= RATE_WINDOW:
+            self._previous_counts, self._previous_elapsed = self._counts, counted
+            self._counts = {}
+            self._counted_since = now
+        self._control.send(("rates", (request_id, rates)))
+
+    def _wait(self, ws, timeout: float) -> list:
+        sock = ws.sock
+        if hasattr(sock, "pending") and sock.pending():  # data already decrypted by the TLS layer
+            return [sock]
+        return multiprocessing.connection.wait([self._control, sock], timeout)
+
+    def _receive(self, ws, failed: bool = False):
+        # blocks until a message or a subscription change arrives or a conflated message is due, instead of polling
+        conflator = Conflator(self._frequency_limit) if self._frequency_limit else None
+        for serialized in self._gaps.connected(self._subscribed, failed):
+            self._offer(serialized, conflator)
+        last_received = time.monotonic()
+        # half way through the timeout without messages a ping tells a quiet feed from a dead connection
+        pinged = self._ponged = False
+        while self._running:
+            now = time.monotonic()
+            next_due = self._deliver_due(conflator, now)
+            silent = now - last_received
+            if silent >= self._timeout:
+                if not self._ponged:
+                    raise StreamError(detail="No answer to a ping within {} seconds.".format(self._timeout / 2))
+                return  # the connection is alive, nothing was missed
+            if not pinged and silent >= self._timeout / 2:
+                ws.ping()
+                pinged = True
+            wake = (self._timeout if pinged else self._timeout / 2) - silent
+            ready = self._wait(ws, wake if next_due is None else min(next_due, wake))
+            if self._control in ready:
+                self._handle_control(ws)
+                continue
+            if not ready:
+                continue
+
+            delivered = self._deliver_batch(ws) if self._batch_size else self._deliver(ws, conflator)
+            if not delivered:
+                continue
+            last_received = time.monotonic()
+            pinged = self._ponged = False
+
+    def _deliver_due(self, conflator: Optional[Conflator], now: float) -> Optional[float]:
+        # pass on the conflated messages which are due and write the recorded frames which are due, returns the
+        # seconds until the next one is due
+        next_due = None
+        if conflator is not None:
+            for serialized in conflator.due(now):
                 self._callback(serialized)
-                self._last_message_time = time()
-            ws.close()
+            next_due = conflator.next_due(now)
+        if self._buffer is not None and not self._buffer.flush():
+            next_due = RETRY_INTERVAL if next_due is None else min(next_due, RETRY_INTERVAL)
+        if self._recorder is not None:
+            # frames recorded before the stream went quiet are written without waiting for the next one
+            flush_due = self._recorder.flush_due()
+            if flush_due is not None:
+                next_due = flush_due if next_due is None else min(next_due, flush_due)
+        return next_due
+
+    def _deliver(self, ws, conflator: Optional[Conflator]) -> bool:
+        # receive one message and pass it on, False if it was skipped
+        message = self._recv(ws)
+        if message is None:
+            return False
+        try:
+            serialized = self._serializer(message, self._subscribed)
+        except KeyError:  # a message of an ISIN which has just been unsubscribed
+            return False
+        self._counts[serialized.isin] = self._counts.get(serialized.isin, 0) + 1
+        if self._gaps.received(serialized):  # not yet passed on as part of a backfill
+            self._offer(serialized, conflator)
+        return True
+
+    def _offer(self, serialized: BaseSerializer, conflator: Optional[Conflator]):
+        if conflator is None or conflator.offer(serialized.isin, serialized, time.monotonic()) is not None:
+            self._callback(serialized)
+
+    def _deliver_batch(self, ws) -> bool:
+        # receive the messages which are already waiting and pass them on as columns, False if there were none
+        messages = [self._recv(ws)]
+        while len(messages) < self._batch_size and ws.sock in self._wait(ws, 0):
+            messages.append(self._recv(ws))
+        messages = [message for message in messages if message is not None]
+        if not messages:
+            return False
+        columns = self._serializer.decode_batch(messages, self._subscribed)
+        self._gaps.touch()
+        for isin in columns["isin"]:
+            self._counts[isin] = self._counts.get(isin, 0) + 1
+        if len(columns["isin"]):
+            self._callback(columns)
+        return True
 
 
 class StreamBase():
     _serializer = _connect_url = _type = _specifiers = _default_specifier = None
-
-    def __init__(self, callback: Callable, timeout: float = 10, frequency_limit: float = 0):
+    # the data class the history of missed messages is fetched with, None if there is none
+    _backfill_class = None
+
+    def __init__(self, callback: Callable = None, timeout: float = 10, frequency_limit: float = 0, batch_size: int = 0,
+                 buffer_size: int = 0, overflow: str = "block", record_to: str = None,
+                 authorization_token: Union[str, "Token"] = None):
+        assert not (batch_size and frequency_limit), 'Conflation is not supported in batch mode!'
+        assert not (batch_size and authorization_token), 'Gaps are not filled in batch mode!'
+        assert (callback is None) == bool(buffer_size), 'Pass either a callback or a buffer_size!'
+        assert not (batch_size and buffer_size), 'Batches are not supported with a buffer!'
         self._timeout = timeout
         self._frequency_limit = frequency_limit
-        manager = multiprocessing.Manager()
-        self._subscribed = manager.dict()
-        self._keepalive = manager.Value('B', True)
-        self._restart = manager.Value('B', False)
-
-        self._ws_process = WSWorker(self._keepalive, self._restart,
-                                    self._subscribed, self._serializer,
+        self._subscribed = {}
+        self._reports = 0
+        self._control, worker_control = multiprocessing.Pipe()
+        self._buffer: Optional[RingBuffer] = None
+        if buffer_size:
+            self._buffer = RingBuffer(self._serializer._record_type, buffer_size, overflow=overflow)
+            callback = self._buffer.put_item
+
+        recorder = StreamRecorder(record_to, self._type) if record_to is not None else None
+        gaps = GapTracker(self._serializer, self._backfill_class,
+                          str(authorization_token) if authorization_token is not None else None,
+                          request_timeout=self._timeout)
+
+        self._ws_process = WSWorker(worker_control, self._serializer,
                                     self._connect_url, self._type,
                                     callback, self._timeout,
-                                    self._frequency_limit)
+                                    self._frequency_limit, batch_size, self._buffer, recorder, gaps)
         self._ws_process.daemon = True
-        self._keepalive.value = True
         self._ws_process.start()
 
     def __del__(self):
         try:
-            self._keepalive.value = False
-            self._ws_process.join()
-            del self._manager
+            self.close()
         except Exception:
             pass
 
+    def close(self):
+        """
+        Stop receiving and wait for the stream process to end.
+        """
+        if self._buffer is not None:
+            self._buffer.close()  # also stops the stream process from waiting for space
+        self._control.send(("close", None))
+        self._ws_process.join()
+
     def subscribe(self, isin: str, specifier: str = None):
+        self.subscribe_many([isin], specifier=specifier)
+
+    def subscribe_many(self, isins: Iterable[str], specifier: str = None):
+        """
+        Subscribe to several ISINs at once. Only ISINs which are not subscribed yet are sent, on the open connection.
+        """
         if specifier is None:
             specifier = self._default_specifier
         assert specifier in self._specifiers, 'Unsupported specifier!'
-        if isin in self._subscribed.keys():
+        added = {isin: specifier for isin in isins if isin not in self._subscribed}
+        if not added:
             return
-        self._subscribed[isin] = specifier
-        self._restart.value = True
+        self._subscribed.update(added)
+        self._control.send(("subscribe", added))
 
     def unsubscribe(self, isin: str):
         del self._subscribed[isin]
-        self._restart.value = True
+        self._control.send(("unsubscribe", [isin]))
+
+    def unsubscribe_many(self, isins: Iterable[str]):
+        removed = [isin for isin in isins if self._subscribed.pop(isin, None) is not None]
+        if removed:
+            self._control.send(("unsubscribe", removed))
+
+    @property
+    def buffer(self) -> Optional[RingBuffer]:
+        """
+        The buffer messages are delivered to if the stream was created with a `buffer_size`, e.g. for its
+        :attr:`lemon_markets.common.ringbuffer.RingBuffer.dropped` count.
+        """
+        return self._buffer
+
+    def read(self, max_records: int = None, timeout: Optional[float] = 0) -> "numpy.ndarray":
+        """
+        The next messages from the buffer of a stream created with a `buffer_size`, as numpy structured array of the
+        serializer's record type (ISINs and sides are bytes). See :meth:`lemon_markets.common.ringbuffer.RingBuffer.read`,
+        the result may be a view which is only valid until the next call.
+        """
+        assert self._buffer is not None, 'The stream has no buffer!'
+        return self._buffer.read(max_records=max_records, timeout=timeout)
+
+    @property
+    def subscribed(self) -> Dict[str, str]:
+        """
+        The subscribed ISINs and their specifiers.
+        """
+        return dict(self._subscribed)
+
+    def message_rates(self, timeout: float = 1) -> Optional[Dict[str, float]]:
+        """
+        Messages per second received for every subscribed ISIN over the last five to ten seconds (or since the start of
+        the stream). None if the stream process did not answer within `timeout` seconds, e.g. because it is reconnecting.
+        """
+        return self._query("report", timeout)
+
+    def gap_metrics(self, timeout: float = 1) -> Optional[Dict[str, float]]:
+        """
+        The gaps of the stream so far: the number of `reconnects`, the seconds without messages around the ones caused
+        by a broken connection (`gap_seconds` in total and `last_gap_seconds`), the number of messages `backfilled` from the history, of
+        received messages dropped as `duplicates` of backfilled ones, and of ISINs whose backfill failed
+        (`backfill_errors`). None if the stream process did not answer within `timeout` seconds.
+        """
+        return self._query("gaps", timeout)
+
+    def _query(self, action: str, timeout: float) -> Any:
+        # send a request to the stream process and wait for its answer
+        self._reports += 1
+        self._control.send((action, self._reports))
+        deadline = time.monotonic() + timeout
+        while self._control.poll(max(0.0, deadline - time.monotonic())):
+            _, (request_id, answer) = self._control.recv()
+            if request_id == self._reports:  # skip answers to earlier requests which timed out
+                return answer
+        return None
 
 
 class TickStream(StreamBase):
     '''A wrapper for the marketdata endpoint
 
     Args:
-        callback (Callable, required): The function to call when new data is received
+        callback (Callable, optional): The function to call when new data is received, required unless `buffer_size` is set
         timeout (float, optional): How many seconds for no data has to be received to trigger an automatic reconnect. Default is 10
-        frequency_limit (float, optional): If set, the maximum frequency at which the callback can be called
+        frequency_limit (float, optional): If set, the minimum number of seconds between two callbacks for the same
+            ISIN. Messages received in between are conflated, only the most recent one is passed to the callback
+        batch_size (int, optional): If set, up to this many messages which arrived together are decoded at once and
+            the callback is passed a dict of numpy arrays (see :meth:`lemon_markets.data.streams.Tick.decode_batch`)
+            instead of one object per message. Requires numpy, cannot be combined with `frequency_limit`
+        buffer_size (int, optional): If set, no callback is used: the ticks are written as fixed size records to a
+            shared memory buffer of this many records, read in this process with :meth:`read`. Requires numpy and
+            Python 3.8
+        overflow (str, optional): What happens if the buffer is full: "block" (default) waits for :meth:`read`,
+            "drop_oldest" overwrites the oldest records, "conflate" keeps the newest record per ISIN until there is space
+        record_to (str, optional): If set, the raw frames received are recorded to daily logs in this directory, to
+            be replayed with :class:`lemon_markets.data.recording.StreamReplayer`
+        authorization_token (str, optional): If set, the ticks missed while the stream reconnects after its
+            connection broke are fetched as :class:`lemon_markets.data.ohlc.Trades` with this token and passed to the
+            callback in the order of their dates (without quantity and side), before any new tick. Every request
+            waits at most `timeout` seconds. See :meth:`gap_metrics`
 
     Note:
         The callback has to accept one parameter. This parameter will be passed a :class:`lemon_markets.data.streams.Tick` object
@@ -185,6 +602,7 @@ class TickStream(StreamBase):
     _connect_url = DEFAULT_STREAM_API_URL+'marketdata/'
     _type = 'trades'
     _serializer = Tick
+    _backfill_class = Trades
     _specifiers = ['with-quantity', 'with-uncovered', 'with-quantity-with-uncovered']
     _default_specifier = 'with-uncovered'
 
@@ -193,9 +611,20 @@ class QuoteStream(StreamBase):
     '''A wrapper for the quotes endpoint
 
     Args:
-        callback (Callable, required): The function to call when new data is received
+        callback (Callable, optional): The function to call when new data is received, required unless `buffer_size` is set
         timeout (float, optional): How many seconds for no data has to be received to trigger an automatic reconnect. Default is 10
-        frequency_limit (float, optional): If set, the maximum frequency at which the callback can be called
+        frequency_limit (float, optional): If set, the minimum number of seconds between two callbacks for the same
+            ISIN. Messages received in between are conflated, only the most recent one is passed to the callback
+        batch_size (int, optional): If set, up to this many messages which arrived together are decoded at once and
+            the callback is passed a dict of numpy arrays (see :meth:`lemon_markets.data.streams.Quote.decode_batch`)
+            instead of one object per message. Requires numpy, cannot be combined with `frequency_limit`
+        buffer_size (int, optional): If set, no callback is used: the quotes are written as fixed size records to a
+            shared memory buffer of this many records, read in this process with :meth:`read`. Requires numpy and
+            Python 3.8
+        overflow (str, optional): What happens if the buffer is full: "block" (default) waits for :meth:`read`,
+            "drop_oldest" overwrites the oldest records, "conflate" keeps the newest record per ISIN until there is space
+        record_to (str, optional): If set, the raw frames received are recorded to daily logs in this directory, to
+            be replayed with :class:`lemon_markets.data.recording.StreamReplayer`
 
     Note:
         The callback has to accept one parameter. This parameter will be passed a :class:`lemon_markets.data.streams.Quote`
@@ -206,3 +635,135 @@ class QuoteStream(StreamBase):
     _serializer = Quote
     _specifiers = ['with-quantity', 'with-price', 'with-quantity-with-price']
     _default_specifier = 'with-price'
+
+
+class ShardedStream:
+    '''One logical stream spread over several connections, each received and decoded in its own process
+
+    Args:
+        stream_class (type, required): :class:`TickStream` or :class:`QuoteStream`
+        callback (Callable, required): The function to call when new data is received
+        shards (int, optional): The number of connections (and processes). Default is 4
+        timeout (float, optional): How many seconds for no data has to be received to trigger an automatic reconnect. Default is 10
+        frequency_limit (float, optional): If set, the minimum number of seconds between two callbacks for the same
+            ISIN. Messages received in between are conflated, only the most recent one is passed to the callback
+        batch_size (int, optional): If set, the callback is passed the messages which arrived together as columns,
+            see :class:`TickStream`
+        authorization_token (str, optional): If set, ticks missed while reconnecting are filled in, see :class:`TickStream`
+
+    New ISINs are subscribed on the shard with the lowest message rate. As rates change over the day, call
+    :meth:`rebalance` from time to time to move ISINs from the busiest to the least busy shard.
+
+    Note:
+        The callback is called in the process of the shard the ISIN is subscribed on, so callbacks for different ISINs
+        may run at the same time. Moving an ISIN unsubscribes it on its old shard before subscribing it on the new one
+    '''
+
+    def __init__(self, stream_class: type, callback: Callable, shards: int = DEFAULT_STREAM_SHARDS,
+                 timeout: float = 10, frequency_limit: float = 0, batch_size: int = 0,
+                 authorization_token: Union[str, "Token"] = None):
+        self._stream_class = stream_class
+        self._shards: List[StreamBase] = [stream_class(callback=callback, timeout=timeout, frequency_limit=frequency_limit,
+                                                       batch_size=batch_size, authorization_token=authorization_token)
+                                          for _ in range(shards)]
+        self._shard_of: Dict[str, int] = {}
+        # the last known messages per second by ISIN
+        self._rates: Dict[str, float] = {}
+        # ISINs moved by rebalance and when, their new shard needs a full rate window to measure them
+        self._moved: Dict[str, float] = {}
+
+    def close(self):
+        for shard in self._shards:
+            shard.close()
+
+    def shard_of(self, isin: str) -> Optional[int]:
+        return self._shard_of.get(isin)
+
+    def _estimate(self, isin: str) -> float:
+        # ISINs without a measured rate are assumed to be as busy as the average one
+        if isin in self._rates:
+            return self._rates[isin]
+        return sum(self._rates.values()) / len(self._rates) if self._rates else 1.0
+
+    def loads(self) -> List[float]:
+        """
+        The (estimated) messages per second of every shard.
+        """
+        loads = [0.0] * len(self._shards)
+        for isin, shard in self._shard_of.items():
+            loads[shard] += self._estimate(isin)
+        return loads
+
+    def subscribe(self, isin: str, specifier: str = None):
+        self.subscribe_many([isin], specifier=specifier)
+
+    def subscribe_many(self, isins: Iterable[str], specifier: str = None):
+        if specifier is None:
+            specifier = self._stream_class._default_specifier
+        loads = self.loads()
+        added: Dict[int, List[str]] = {}
+        for isin in isins:
+            if isin in self._shard_of:
+                continue
+            shard = loads.index(min(loads))
+            self._shard_of[isin] = shard
+            loads[shard] += self._estimate(isin)
+            added.setdefault(shard, []).append(isin)
+        for shard, shard_isins in added.items():
+            self._shards[shard].subscribe_many(shard_isins, specifier=specifier)
+
+    def unsubscribe(self, isin: str):
+        shard = self._shard_of.pop(isin)
+        self._shards[shard].unsubscribe(isin)
+
+    def unsubscribe_many(self, isins: Iterable[str]):
+        removed: Dict[int, List[str]] = {}
+        for isin in isins:
+            shard = self._shard_of.pop(isin, None)
+            if shard is not None:
+                removed.setdefault(shard, []).append(isin)
+        for shard, shard_isins in removed.items():
+            self._shards[shard].unsubscribe_many(shard_isins)
+
+    def update_rates(self, timeout: float = 1) -> Dict[str, float]:
+        """
+        Fetch the message rates measured by the shards. Shards which do not answer within `timeout` keep their
+        previous rates.
+        """
+        now = time.monotonic()
+        self._moved = {isin: moved for isin, moved in self._moved.items() if now - moved < 2 * RATE_WINDOW}
+        for shard in self._shards:
+            rates = shard.message_rates(timeout=timeout)
+            if rates is not None:
+                self._rates.update((isin, rate) for isin, rate in rates.items() if isin not in self._moved)
+        self._rates = {isin: rate for isin, rate in self._rates.items() if isin in self._shard_of}
+        return dict(self._rates)
+
+    def rebalance(self, max_moves: int = 10, timeout: float = 1) -> int:
+        """
+        Move up to `max_moves` ISINs from the busiest to the least busy shards, based on the message rates measured
+        by the shards.
+
+        :return: the number of moved ISINs
+        """
+        self.update_rates(timeout=timeout)
+        loads = self.loads()
+        moves = 0
+        while moves < max_moves:
+            busiest, idlest = loads.index(max(loads)), loads.index(min(loads))
+            difference = loads[busiest] - loads[idlest]
+            # moving an ISIN helps if its rate is below the difference, most if it is half of it
+            candidates = [isin for isin, shard in self._shard_of.items()
+                          if shard == busiest and 0 < self._estimate(isin) < difference]
+            if not candidates:
+                break
+            isin = min(candidates, key=lambda candidate: abs(difference / 2 - self._estimate(candidate)))
+            specifier = self._shards[busiest].subscribed[isin]
+            self._shards[busiest].unsubscribe(isin)
+            self._shards[idlest].subscribe(isin, specifier=specifier)
+            self._shard_of[isin] = idlest
+            self._moved[isin] = time.monotonic()
+            loads[busiest] -= self._estimate(isin)
+            loads[idlest] += self._estimate(isin)
+            moves += 1
+        return moves
@@ -38,13 +38,25 @@ class Instrument(AbstractApiObjectMixin, ListMixin):
                               type=type,
                               authorization_token=authorization_token)
 
+    @staticmethod
+    async def list_async(
+            search: str = "",
+            type: Union[str, list] = "",
+            authorization_token: Union[str, "Token"] = None,
+    ) -> ListIterator:
+        return await ListMixin.list_async(object_class=Instrument,
+                                          search=search,
+                                          type=type,
+                                          authorization_token=authorization_token)
+
     def retrieve(self):
-        request = ApiRequest(
-            endpoint="data/instruments/{}/".format(self.isin),
-            method="GET",
-            authorization_token=self.authorization_token,
-            account=self.account
-        )
-
-        self.set_data(request.response)
-        return self
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
+
+    def _retrieve_request_arguments(self) -> dict:
+        return {
+            "endpoint": "data/instruments/{}/".format(self.isin),
+            "method": "GET",
+            "authorization_token": self.authorization_token,
+            "account": self.account
+        }
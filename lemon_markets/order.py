@@ -2,6 +2,7 @@ import datetime
 from typing import Union
 
 from lemon_markets.account import Account
+from lemon_markets.common.async_requests import AsyncApiRequest
 from lemon_markets.common.errors import BaseError
 from lemon_markets.common.helpers import UUIDAccountObjectMixin, CreateMixin
 from lemon_markets.common.objects import AbstractApiObjectMixin, ListMixin
@@ -57,27 +58,34 @@ class Order(CreateMixin, UUIDAccountObjectMixin, AbstractApiObjectMixin, ListMix
         )
 
     def retrieve(self):
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
+
+    def _retrieve_request_arguments(self) -> dict:
         self.check_instance()
-        request = ApiRequest(
-            endpoint="orders/{}/".format(self.uuid),
-            account=self.account,
-            method="GET"
-        )
+        return {
+            "endpoint": "orders/{}/".format(self.uuid),
+            "account": self.account,
+            "method": "GET"
+        }
+
+    def create(self):
+        request = ApiRequest(**self._create_request_arguments())
+        self.set_data(request.response)
 
+    async def create_async(self):
+        request = await AsyncApiRequest(**self._create_request_arguments()).perform()
         self.set_data(request.response)
-        return self
 
-    def create(self):
+    def _create_request_arguments(self) -> dict:
         if self.uuid:
             raise OrderError(detail="Cannot create order as it already exists.")
-        request = ApiRequest(
-            endpoint="orders/",
-            account=self.account,
-            method="POST",
-            body=self._build_body()
-        )
-
-        self.set_data(request.response)
+        return {
+            "endpoint": "orders/",
+            "account": self.account,
+            "method": "POST",
+            "body": self._build_body()
+        }
 
     def destroy(self, raise_exception: bool = False) -> bool:
         try:
@@ -110,6 +118,11 @@ class Order(CreateMixin, UUIDAccountObjectMixin, AbstractApiObjectMixin, ListMix
         return ListMixin.list(object_class=Order, account=account, ordering=ordering, limit=limit, offset=offset,
                               list_endpoint="orders/")
 
+    @staticmethod
+    async def list_async(account: Account, ordering: str = "-created_at", limit: int = None, offset: int = None):
+        return await ListMixin.list_async(object_class=Order, account=account, ordering=ordering, limit=limit,
+                                          offset=offset, list_endpoint="orders/")
+
     @property
     def is_executed(self) -> bool:
         """
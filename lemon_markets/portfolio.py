@@ -23,20 +23,26 @@ class Portfolio(AbstractApiObjectMixin, ListMixin):
 
     @property
     def retrieve(self):
-        request = ApiRequest(
-            endpoint="portfolio/{}/".format(self.isin),
-            account=self.account,
-            method="GET"
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
-        self.set_data(request.response)
-        return self
+    def _retrieve_request_arguments(self) -> dict:
+        return {
+            "endpoint": "portfolio/{}/".format(self.isin),
+            "account": self.account,
+            "method": "GET"
+        }
 
     @staticmethod
     def list(account: Account, limit: int = None, offset: int = None) -> ListIterator:
         return ListMixin.list(object_class=Portfolio, account=account, limit=limit, offset=offset,
                               list_endpoint="portfolio/")
 
+    @staticmethod
+    async def list_async(account: Account, limit: int = None, offset: int = None) -> ListIterator:
+        return await ListMixin.list_async(object_class=Portfolio, account=account, limit=limit, offset=offset,
+                                          list_endpoint="portfolio/")
+
 
 class AggregatedPortfolio(AbstractApiObjectMixin, ListMixin):
 
@@ -58,16 +64,22 @@ class AggregatedPortfolio(AbstractApiObjectMixin, ListMixin):
 
     @property
     def retrieve(self):
-        request = ApiRequest(
-            endpoint="portfolio/{}/aggregated/".format(self.isin),
-            account=self.account,
-            method="GET"
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
-        self.set_data(request.response)
-        return self
+    def _retrieve_request_arguments(self) -> dict:
+        return {
+            "endpoint": "portfolio/{}/aggregated/".format(self.isin),
+            "account": self.account,
+            "method": "GET"
+        }
 
     @staticmethod
     def list(account: Account, limit: int = None, offset: int = None) -> ListIterator:
         return ListMixin.list(object_class=Portfolio, account=account, limit=limit, offset=offset,
                               list_endpoint="portfolio/aggregated/")
+
+    @staticmethod
+    async def list_async(account: Account, limit: int = None, offset: int = None) -> ListIterator:
+        return await ListMixin.list_async(object_class=Portfolio, account=account, limit=limit, offset=offset,
+                                          list_endpoint="portfolio/aggregated/")
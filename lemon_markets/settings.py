@@ -1,2 +1,48 @@
+import os
+
 DEFAULT_REST_API_URL: str = "https://api.lemon.markets/rest/v1/"
 DEFAULT_STREAM_API_URL: str = "wss://api.lemon.markets/streams/v1/"
+
+# connection pool used by all REST requests (see lemon_markets.common.requests.SessionPool)
+DEFAULT_POOL_CONNECTIONS: int = 10  # number of hosts to keep a connection pool for
+DEFAULT_POOL_MAXSIZE: int = 32  # maximum number of keep-alive connections per host
+DEFAULT_POOL_BLOCK: bool = False  # block instead of opening throwaway connections once a host pool is exhausted
+
+# asyncio REST client (see lemon_markets.common.async_requests.AsyncSessionPool)
+DEFAULT_ASYNC_MAX_CONCURRENCY: int = 100  # maximum number of requests in flight per event loop
+DEFAULT_ASYNC_LIMIT_PER_HOST: int = 0  # maximum number of connections per host, 0 means no limit apart from the above
+
+# batch execution of deferred requests (see lemon_markets.common.batch.BatchExecutor)
+DEFAULT_BATCH_MAX_WORKERS: int = 16  # maximum number of requests in flight per batch
+
+# client side rate limits per endpoint group as (requests per second, burst), None means no limit
+# (see lemon_markets.common.ratelimit.RateLimiter)
+DEFAULT_RATE_LIMITS: dict = {
+    "trading": None,  # everything related to accounts, orders, portfolios etc.
+    "data": None,  # market data, i.e. all endpoints below data/
+}
+
+# automatic retries of failed requests (see lemon_markets.common.retry.RetryPolicy)
+DEFAULT_MAX_RETRIES: int = 3
+DEFAULT_BACKOFF_FACTOR: float = 0.5  # the n-th retry waits up to backoff_factor * 2 ** n seconds
+DEFAULT_MAX_BACKOFF: float = 30  # upper bound of a single wait, unless the server asks for more via Retry-After
+
+# response cache for GET requests of slowly changing objects (see lemon_markets.common.cache.ResponseCache)
+DEFAULT_CACHE_MAXSIZE: int = 1024  # maximum number of cached responses, 0 disables caching
+DEFAULT_CACHE_POLICIES: dict = {
+    # regular expression matched against the endpoint (relative to the REST API url): time to live in seconds
+    r"^data/instruments/$": 3600,
+    r"^data/instruments/[^/]+/$": 3600,
+    r"^token/[^/]+/$": 300,
+    r"^accounts/[^/]+/$": 300,
+    r"^(accounts/[^/]+/)?strategies/[^/]+/$": 300,
+}
+
+# offline instrument catalog (see lemon_markets.catalog.InstrumentCatalog)
+DEFAULT_CATALOG_PATH: str = os.path.join(os.path.expanduser("~"), ".lemon_markets", "instruments.sqlite3")
+
+# local time-series store (see lemon_markets.data.store.CandleStore)
+DEFAULT_STORE_PATH: str = os.path.join(os.path.expanduser("~"), ".lemon_markets", "store")
+
+# sharded streams (see lemon_markets.data.streams.ShardedStream)
+DEFAULT_STREAM_SHARDS: int = 4  # number of connections and stream processes
@@ -22,17 +22,23 @@ class Strategy(UUIDAccountObjectMixin, AbstractApiObjectMixin, ListMixin):
         super().__init__(uuid=uuid, account=account, **kwargs)
 
     def retrieve(self):
-        self.check_instance()
-        request = ApiRequest(
-            endpoint="strategies/{}/".format(self.uuid),
-            account=self.account,
-            method="GET"
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
-        self.set_data(request.response)
-        return self
+    def _retrieve_request_arguments(self) -> dict:
+        self.check_instance()
+        return {
+            "endpoint": "strategies/{}/".format(self.uuid),
+            "account": self.account,
+            "method": "GET"
+        }
 
     @staticmethod
     def list(account: Account, limit: int = None, offset: int = None) -> ListIterator:
         return ListMixin.list(object_class=Strategy, account=account, limit=limit, offset=offset,
                               list_endpoint="strategies/")
+
+    @staticmethod
+    async def list_async(account: Account, limit: int = None, offset: int = None) -> ListIterator:
+        return await ListMixin.list_async(object_class=Strategy, account=account, limit=limit, offset=offset,
+                                          list_endpoint="strategies/")
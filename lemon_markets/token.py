@@ -1,7 +1,7 @@
 from typing import List, Union
 from lemon_markets.account import Account
 from lemon_markets.common.objects import AbstractApiObjectMixin, ListIterator, ListMixin
-from lemon_markets.common.requests import ApiRequest
+from lemon_markets.common.requests import ApiRequest, BaseApiRequest
 from lemon_markets.strategy import Strategy
 
 
@@ -29,12 +29,17 @@ class Token(AbstractApiObjectMixin):
         permissions: List[Permission]
 
     def retrieve(self):
-        request = ApiRequest(
-            endpoint="token/{}/".format(self.key),
-            authorization_token=self.key,
-            method="GET",
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
+    def _retrieve_request_arguments(self) -> dict:
+        return {
+            "endpoint": "token/{}/".format(self.key),
+            "authorization_token": self.key,
+            "method": "GET",
+        }
+
+    def _build_retrieved(self, request: BaseApiRequest):
         self._build_object(request=request)
         # make the usage of the Account class object more convenient by accessing the token directly
         if hasattr(self, "account"):
@@ -48,5 +53,11 @@ class Token(AbstractApiObjectMixin):
                               authorization_token=authorization_token,
                               list_endpoint="token/")
 
+    @staticmethod
+    async def list_async(authorization_token: Union[str, "Token"] = None) -> ListIterator:
+        return await ListMixin.list_async(object_class=Token,
+                                          authorization_token=authorization_token,
+                                          list_endpoint="token/")
+
     def __str__(self):
         return str(self.key)
@@ -21,17 +21,23 @@ class Transaction(UUIDAccountObjectMixin, AbstractApiObjectMixin, ListMixin):
         super().__init__(uuid=uuid, account=account, **kwargs)
 
     def retrieve(self):
-        self.check_instance()
-        request = ApiRequest(
-            endpoint="transactions/{}/".format(self.uuid),
-            account=self.account,
-            method="GET"
-        )
+        request = ApiRequest(**self._retrieve_request_arguments())
+        return self._build_retrieved(request)
 
-        self.set_data(request.response)
-        return self
+    def _retrieve_request_arguments(self) -> dict:
+        self.check_instance()
+        return {
+            "endpoint": "transactions/{}/".format(self.uuid),
+            "account": self.account,
+            "method": "GET"
+        }
 
     @staticmethod
     def list(account: Account, limit: int = None, offset: int = None):
         return ListMixin.list(object_class=Transaction, account=account, limit=limit, offset=offset,
                               list_endpoint="transactions/")
+
+    @staticmethod
+    async def list_async(account: Account, limit: int = None, offset: int = None):
+        return await ListMixin.list_async(object_class=Transaction, account=account, limit=limit, offset=offset,
+                                          list_endpoint="transactions/")
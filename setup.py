@@ -13,6 +13,12 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/lemon-markets/lemon-markets-python-sdk",
     packages=setuptools.find_packages(),
+    extras_require={
+        "async": ["aiohttp>=3.7"],
+        "speedups": ["orjson"],
+        "numpy": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",